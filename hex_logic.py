@@ -48,22 +48,52 @@ EDGE_NEIGHBOR_DELTAS = [
 import math
 
 
+def hex_to_pixel(q, r, hex_size, point_top=True):
+    """Convert axial (q, r) into the pixel center of the hex (origin at hex (0, 0))."""
+    if point_top:
+        x = hex_size * math.sqrt(3) * (q + r / 2)
+        y = hex_size * 1.5 * r
+    else:
+        x = hex_size * 1.5 * q
+        y = hex_size * math.sqrt(3) * (r + q / 2)
+    return x, y
+
+
+def axial_round(q, r):
+    """Round fractional axial coordinates to the containing hex (via cube coordinates)."""
+    s = -q - r
+    rq, rr, rs = round(q), round(r), round(s)
+    dq, dr, ds = abs(rq - q), abs(rr - r), abs(rs - s)
+    if dq > dr and dq > ds:
+        rq = -rr - rs
+    elif dr > ds:
+        rr = -rq - rs
+    return int(rq), int(rr)
+
+
+def pixel_to_hex(x, y, hex_size, point_top=True):
+    """
+    Inverse of hex_to_pixel: return the axial (q, r) of the hex containing (x, y).
+    Constant time, no matter how many hexes are on the board.
+    """
+    if point_top:
+        q = (math.sqrt(3) / 3 * x - y / 3) / hex_size
+        r = (2 / 3 * y) / hex_size
+    else:
+        q = (2 / 3 * x) / hex_size
+        r = (-x / 3 + math.sqrt(3) / 3 * y) / hex_size
+    return axial_round(q, r)
+
+
 def peg_to_pixel(q, r, peg_index, hex_size, point_top=True):
     """
     Convert a peg's (q, r, peg_index) into screen (x, y) coordinates.
-    - Assumes pointy-topped hexagons.
     - peg_index: 0–11 (alternating corners and edges around the hex)
     - hex_size: radius of a hexagon (distance from center to corner)
     """
     # 1. Convert hex axial coords to pixel center
     sqrt3 = math.sqrt(3)
-
-    if point_top:
-        cx = hex_size * sqrt3 * (q + r / 2)
-        cy = hex_size * 1.5 * r
-    else:
-        cx = hex_size * 1.5 * q
-        cy = hex_size * math.sqrt(3) * (r + q / 2)
+    cx, cy = hex_to_pixel(q, r, hex_size, point_top)
 
     # 2. Determine angle and radius to peg point
     angle_deg = 30 * peg_index  # peg_index 0 = top (0°), then clockwise
@@ -85,6 +115,56 @@ def peg_to_pixel(q, r, peg_index, hex_size, point_top=True):
     return x, y
 
 
+def pixel_to_peg(x, y, hex_size, point_top=True):
+    """
+    Inverse of peg_to_pixel: return (q, r, peg_index) of the peg hole nearest to (x, y).
+    Only the 12 holes of the containing hex are checked.
+    """
+    q, r = pixel_to_hex(x, y, hex_size, point_top)
+    best_index, best_distance = 0, None
+    for peg_index in range(12):
+        px, py = peg_to_pixel(q, r, peg_index, hex_size, point_top)
+        distance = (px - x) ** 2 + (py - y) ** 2
+        if best_distance is None or distance < best_distance:
+            best_index, best_distance = peg_index, distance
+    return q, r, best_index
+
+
+def hex_neighbors(q, r):
+    """Return the 6 axial neighbors of (q, r), in cyclic order."""
+    return [(q + dq, r + dr) for dq, dr in POINTY_DIRECTIONS]
+
+
+def hex_slots(q, r):
+    """
+    Return the 12 peg positions around hex (q, r), in cyclic order.
+    Positions are canonical sorted tuples of the hexes they touch
+    (edges touch 2 hexes, vertices touch 3), independent of orientation.
+    """
+    center = (q, r)
+    neighbors = hex_neighbors(q, r)
+    slots = []
+    for i, neighbor in enumerate(neighbors):
+        next_neighbor = neighbors[(i + 1) % 6]
+        slots.append(tuple(sorted((center, neighbor))))
+        slots.append(tuple(sorted((center, neighbor, next_neighbor))))
+    return slots
+
+
+def slot_neighbors(position):
+    """
+    Return the peg positions adjacent to a position.
+    - Vertex (3 hexes): the 3 edges between each pair of its hexes
+    - Edge (2 hexes): the 2 vertices at either end
+    """
+    if len(position) == 3:
+        a, b, c = position
+        return [(a, b), (a, c), (b, c)]
+    a, b = position
+    common = set(hex_neighbors(*a)) & set(hex_neighbors(*b))
+    return [tuple(sorted((a, b, c))) for c in common]
+
+
 # def get_hexes_for_peg(q: int, r: int, peg_index: int) -> list[tuple[int, int]]:
 #     """
 #     Returns the list of (q, r) hexes that a peg at a given (q, r) and peg_index (0–11) touches.
@@ -122,6 +202,7 @@ def get_hexes_for_peg(q, r, hex_index, pointy_top):
     """
     Return a sorted tuple of (q, r) tuples = hexes that a peg at this index touches
     Vertices touch 3 hexes, edges touch 2 hexes.
+    hex_index follows peg_to_pixel: 0 = top, then clockwise in 30° steps.
 
     Notes on return value:
         - Sorted = Guaranteed unique peg location
@@ -129,36 +210,40 @@ def get_hexes_for_peg(q, r, hex_index, pointy_top):
     """
     center = (q, r)
 
+    # Neighbor across each edge, clockwise starting from the first edge after the top
     if pointy_top:
         directions = [
-            (1, 0), (1, -1), (0, -1),  # 0,1,2
-            (-1, 0), (-1, 1), (0, 1)   # 3,4,5
+            (1, -1), (1, 0), (0, 1),   # NE, E, SE
+            (-1, 1), (-1, 0), (0, -1)  # SW, W, NW
         ]
+        edge_offset = 1  # edges at odd indices
     else:
         directions = [
-            (1, -1), (1, 0), (0, 1),   # 0,1,2
-            (-1, 1), (-1, 0), (0, -1)  # 3,4,5
+            (0, -1), (1, -1), (1, 0),  # N, NE, SE
+            (0, 1), (-1, 1), (-1, 0)   # S, SW, NW
         ]
+        edge_offset = 0  # edges at even indices
 
     # Normalize hex_index to 0–11
     i = hex_index % 12
-    dir_index = i // 2
-    d = directions[dir_index]
-    d_next = directions[(dir_index + 1) % 6]
 
     # EDGE: touches 2 hexes (center + one neighbor)
-    if i % 2 == 1:
+    if (i - edge_offset) % 2 == 0:
+        d = directions[((i - edge_offset) // 2) % 6]
         hex_list = [center, (q + d[0], r + d[1])]
 
-    # VERTEX: touches 3 hexes (center + two adjacent neighbors)
+    # VERTEX: touches 3 hexes (center + the neighbors across the edges on either side)
     else:
+        dir_index = (i - 1 - edge_offset) // 2
+        d = directions[dir_index % 6]
+        d_next = directions[(dir_index + 1) % 6]
         hex_list = [
             center,
             (q + d[0], r + d[1]),
             (q + d_next[0], r + d_next[1])
         ]
 
-    return sorted(tuple(hex_list))
+    return tuple(sorted(hex_list))
 
 # def get_hexes_for_peg(q, r, hex_index, pointy_top):
 #     """
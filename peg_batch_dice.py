@@ -0,0 +1,187 @@
+"""
+Vectorized PLAY phase: roll rain and food dice for many games at once with NumPy
+and resolve placement onto matching (color, number) hexes with array operations.
+
+All games in a batch share one board layout; sweep layouts by building one
+engine per layout. BatchPlayPhase draws a block of rounds for a single game
+the same way and plays them out one per PLAY phase (see peg_rules.play_round).
+"""
+import logging
+
+import numpy as np
+
+from peg_game_state import GameState
+from peg_model import BoardModel, RAIN_COLOR, DICE_FACES, EVENT_PHASE_CHANGED
+from peg_rules import return_dice
+
+
+NO_TILE = -1  # die not rolled, or no matching hex (stays in the pool)
+N_FACES = len(DICE_FACES)
+DEFAULT_BATCH_ROUNDS = 64  # rounds rolled per BatchPlayPhase refill
+
+
+class BatchRoll:
+    """
+    Result of BatchDiceEngine.roll for G games, P players.
+
+    Attributes:
+        rain_values (G, P, R): rain die faces
+        food_values (G, P, F): food die faces (0 = not rolled)
+        rain_tiles (G, P, R): tile index each rain die landed on, or NO_TILE
+        food_tiles (G, P, F): tile index each food die landed on, or NO_TILE
+        dice_on_tiles (G, T): number of dice on each tile after placement
+    """
+
+    def __init__(self, rain_values, food_values, rain_tiles, food_tiles, dice_on_tiles):
+        self.rain_values = rain_values
+        self.food_values = food_values
+        self.rain_tiles = rain_tiles
+        self.food_tiles = food_tiles
+        self.dice_on_tiles = dice_on_tiles
+
+    @property
+    def n_games(self):
+        return self.rain_values.shape[0]
+
+
+class BatchDiceEngine:
+    def __init__(self, board: BoardModel, colors, n_rain_dice=1, n_food_dice=6, seed=None):
+        """
+        Parameters:
+            board (BoardModel): Layout to place dice on (tiles are read once)
+            colors (list): Player colors, in the order used for the player axis
+            n_rain_dice (int): Rain dice per player
+            n_food_dice (int): Food dice per player
+            seed (int or np.random.SeedSequence): Seed for the batch generator
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.colors = list(colors)
+        self.n_rain_dice = n_rain_dice
+        self.n_food_dice = n_food_dice
+        self.rng = np.random.default_rng(seed)
+
+        self.coords = list(board.hexes)  # tile index -> (q, r)
+        self.build_match_table(board)
+
+    def build_match_table(self, board: BoardModel):
+        """
+        CSR table of matching tiles per (color, face) key:
+            key = color_index * N_FACES + (face - 1)
+            match_tiles[match_offsets[key]:match_offsets[key + 1]] = tile indices
+        """
+        color_index = {}
+        for color in [RAIN_COLOR, *self.colors, *(tile.color for tile in board.hexes.values())]:
+            color_index.setdefault(color, len(color_index))
+        self.color_index = color_index
+
+        n_keys = len(color_index) * N_FACES
+        buckets = [[] for _ in range(n_keys)]
+        for i, (q, r) in enumerate(self.coords):
+            tile = board.hexes[(q, r)]
+            buckets[color_index[tile.color] * N_FACES + tile.number - 1].append(i)
+
+        self.match_counts = np.array([len(bucket) for bucket in buckets], dtype=np.int64)
+        self.match_offsets = np.zeros(n_keys + 1, dtype=np.int64)
+        np.cumsum(self.match_counts, out=self.match_offsets[1:])
+        self.match_tiles = np.array([i for bucket in buckets for i in bucket], dtype=np.int64)
+
+        self.rain_color_index = color_index[RAIN_COLOR]
+        self.player_color_index = np.array([color_index[color] for color in self.colors], dtype=np.int64)
+
+    def place(self, color_indices, values):
+        """
+        Vectorized placement: pick a uniformly random matching tile per die.
+        `values` of 0 mean "not rolled". Returns tile indices (NO_TILE if none).
+        """
+        if not self.match_tiles.size:
+            return np.full(values.shape, NO_TILE, dtype=np.int64)
+        keys = color_indices * N_FACES + np.maximum(values, 1) - 1
+        counts = self.match_counts[keys]
+        choice = (self.rng.random(values.shape) * counts).astype(np.int64)
+        placed = (values > 0) & (counts > 0)
+        # Keys without matches index past their (empty) bucket; clip, then mask out
+        tiles = self.match_tiles[np.minimum(self.match_offsets[keys] + choice, self.match_tiles.size - 1)]
+        return np.where(placed, tiles, NO_TILE)
+
+    def roll(self, n_games):
+        """Roll and place every rain and food die for n_games games."""
+        n_players = len(self.colors)
+        rain_values = self.rng.integers(1, N_FACES + 1, size=(n_games, n_players, self.n_rain_dice))
+
+        # Rain total = number of food dice rolled
+        n_food = np.minimum(rain_values.sum(axis=2), self.n_food_dice)
+        food_values = self.rng.integers(1, N_FACES + 1, size=(n_games, n_players, self.n_food_dice))
+        food_values[np.arange(self.n_food_dice) >= n_food[..., None]] = 0
+
+        rain_tiles = self.place(np.full(rain_values.shape, self.rain_color_index), rain_values)
+        food_tiles = self.place(np.broadcast_to(self.player_color_index[None, :, None], food_values.shape),
+                                food_values)
+
+        dice_on_tiles = self.count_dice_on_tiles(rain_tiles, food_tiles)
+        return BatchRoll(rain_values, food_values, rain_tiles, food_tiles, dice_on_tiles)
+
+    def count_dice_on_tiles(self, *tile_arrays):
+        n_tiles = len(self.coords)
+        n_games = tile_arrays[0].shape[0]
+        tiles = np.concatenate([t.reshape(n_games, -1) for t in tile_arrays], axis=1)
+        game_offsets = np.arange(n_games)[:, None] * n_tiles
+        flat = (tiles + game_offsets)[tiles != NO_TILE]
+        return np.bincount(flat, minlength=n_games * n_tiles).reshape(n_games, n_tiles)
+
+
+def apply_batch_roll(game_state, batch_roll: BatchRoll, game_index, engine: BatchDiceEngine):
+    """
+    Apply one game's slice of a batch roll as its PLAY phase, in place of
+    rolling dice one at a time in peg_rules.play_phase_logic. Board listeners
+    (GameRecorder, GameBoard) see the same events as a per-die PLAY phase.
+    """
+    board = game_state.board
+    game_state.phase = GameState.PHASE_PLAY
+    game_state.current_round += 1
+    board.notify(EVENT_PHASE_CHANGED, game_state)
+    return_dice(game_state)
+
+    # Rain for every player, then food, in PEG order (as peg_rules rolls them)
+    player_index = {color: p for p, color in enumerate(engine.colors)}
+    for values, tiles, attr in ((batch_roll.rain_values, batch_roll.rain_tiles, 'rain_dice'),
+                                (batch_roll.food_values, batch_roll.food_tiles, 'food_dice')):
+        for color in game_state.peg_order:
+            p = player_index[color]
+            for die, value, tile in zip(getattr(game_state.players[color], attr), values[game_index, p],
+                                        tiles[game_index, p]):
+                if not value:
+                    continue  # food die not rolled this round
+                die.set_value(int(value))
+                if tile == NO_TILE:
+                    board.remove_die_from_hex(die)
+                else:
+                    board.assign_die_to_hex(die, board.hexes[engine.coords[tile]])
+
+
+class BatchPlayPhase:
+    def __init__(self, game_state, n_rounds=DEFAULT_BATCH_ROUNDS, seed=None):
+        """
+        PLAY phase for one game, drawn n_rounds at a time from a BatchDiceEngine.
+        Pass it as play_phase to peg_rules.play_round. The tile layout is read
+        once, so it must not change during the game.
+
+        Parameters:
+            game_state (GameState): Game to play (players already seated)
+            n_rounds (int): Rounds rolled per batch
+            seed (int or np.random.SeedSequence): Seed for the batch generator
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        players = list(game_state.players.values())
+        self.engine = BatchDiceEngine(game_state.board, [player.color for player in players],
+                                      n_rain_dice=len(players[0].rain_dice) if players else 1,
+                                      n_food_dice=len(players[0].food_dice) if players else 6, seed=seed)
+        self.n_rounds = n_rounds
+        self.batch = None
+        self.next_round = 0  # index of the next unplayed round in self.batch
+
+    def __call__(self, game_state):
+        if self.batch is None or self.next_round >= self.batch.n_games:
+            self.batch = self.engine.roll(self.n_rounds)
+            self.next_round = 0
+        apply_batch_roll(game_state, self.batch, self.next_round, self.engine)
+        self.next_round += 1
@@ -0,0 +1,200 @@
+"""
+Bitboard occupancy: per-player peg slots stored as Python int bitsets over the
+slot IDs of a SlotTopology (bit i set = slot i occupied).
+
+The slot graph is not a lattice, so "neighbor shift" is done with per-slot
+neighbor masks: neighbors(mask) ORs the masks of the set bits, which costs
+one big-int op per peg rather than a walk over Peg/HexTile objects.
+"""
+import functools
+
+from peg_topology import get_topology, NO_HEX
+
+
+class BitboardTables:
+    """Masks derived from a SlotTopology; shared per board radius."""
+
+    def __init__(self, topology):
+        self.topology = topology
+        self.full_mask = (1 << topology.n_slots) - 1
+        self.vertex_mask = sum(1 << i for i in range(topology.n_slots) if topology.slot_is_vertex[i])
+        self.neighbor_masks = [sum(1 << n for n in neighbors) for neighbors in topology.neighbors]
+
+        # Slots touching each hex: a peg there can EAT from the hex
+        self.hex_masks = [0] * topology.n_hexes
+        for slot_id in range(topology.n_slots):
+            for hex_id in topology.slot_hexes[slot_id * 3:slot_id * 3 + 3]:
+                if hex_id != NO_HEX:
+                    self.hex_masks[hex_id] |= 1 << slot_id
+
+    def __reduce__(self):
+        return get_tables, (self.topology.radius,)
+
+
+@functools.lru_cache(maxsize=None)
+def get_tables(radius):
+    return BitboardTables(get_topology(radius))
+
+
+def popcount(mask):
+    return mask.bit_count()
+
+
+def iter_bits(mask):
+    """Yield the slot IDs set in mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def neighbors(mask, tables: BitboardTables):
+    """Union of the slots adjacent to any slot in mask."""
+    result = 0
+    neighbor_masks = tables.neighbor_masks
+    while mask:
+        low = mask & -mask
+        result |= neighbor_masks[low.bit_length() - 1]
+        mask ^= low
+    return result
+
+
+class BitboardState:
+    """Per-player occupancy bitsets for one board."""
+
+    def __init__(self, radius, colors=()):
+        self.tables = get_tables(radius)
+        self.topology = self.tables.topology
+        self.occupancy = {color: 0 for color in colors}  # color: int bitset of slot IDs
+
+    @classmethod
+    def from_board(cls, board):
+        """Snapshot a BoardModel's pegs."""
+        state = cls(board.radius)
+        for position, peg in board.pegs.items():
+            state.add(peg.color, board.topology.slot_ids[position])
+        return state
+
+    def copy(self):
+        state = type(self).__new__(type(self))
+        state.tables = self.tables
+        state.topology = self.topology
+        state.occupancy = dict(self.occupancy)
+        return state
+
+    def add(self, color, slot_id):
+        self.occupancy[color] = self.occupancy.get(color, 0) | (1 << slot_id)
+
+    def remove(self, color, slot_id):
+        self.occupancy[color] = self.occupancy.get(color, 0) & ~(1 << slot_id)
+
+    def move(self, color, from_slot, to_slot):
+        self.occupancy[color] = (self.occupancy.get(color, 0) & ~(1 << from_slot)) | (1 << to_slot)
+
+    def occupied(self):
+        result = 0
+        for mask in self.occupancy.values():
+            result |= mask
+        return result
+
+    def free(self):
+        return self.tables.full_mask & ~self.occupied()
+
+    def is_free(self, slot_id):
+        return not (self.occupied() >> slot_id) & 1
+
+    def count(self, color):
+        return popcount(self.occupancy.get(color, 0))
+
+    def frontier(self, color):
+        """Free slots adjacent to the player's pegs (legal new-peg slots) as a bitset."""
+        return neighbors(self.occupancy.get(color, 0), self.tables) & self.free()
+
+    def legal_placements(self, color):
+        return list(iter_bits(self.frontier(color)))
+
+    def reachable_hexes(self, color):
+        """Hex IDs touched by at least one of the player's pegs."""
+        mask = self.occupancy.get(color, 0)
+        return [hex_id for hex_id, hex_mask in enumerate(self.tables.hex_masks) if mask & hex_mask]
+
+    def pegs_touching_hex(self, color, hex_id):
+        return popcount(self.occupancy.get(color, 0) & self.tables.hex_masks[hex_id])
+
+    def all_placed(self, color, n_pegs):
+        """Win check: every one of the player's n_pegs is on the board."""
+        return self.count(color) >= n_pegs
+
+
+class TrackedBitboardState(BitboardState):
+    """
+    BitboardState that keeps every player's frontier (legal new-peg slots)
+    up to date on each add/remove, so legal_placements() is a lookup.
+
+    adjacent_counts[color][slot] = number of the player's pegs next to slot.
+    """
+
+    def __init__(self, radius, colors=()):
+        super().__init__(radius, colors)
+        self.all_occupied = 0
+        self.adjacent_counts = {}  # color: [int] * n_slots
+        self.frontiers = {}  # color: int bitset
+
+    def copy(self):
+        state = super().copy()
+        state.all_occupied = self.all_occupied
+        state.adjacent_counts = {color: list(counts) for color, counts in self.adjacent_counts.items()}
+        state.frontiers = dict(self.frontiers)
+        return state
+
+    def get_counts(self, color):
+        counts = self.adjacent_counts.get(color)
+        if counts is None:
+            counts = self.adjacent_counts[color] = [0] * self.topology.n_slots
+            self.frontiers[color] = 0
+        return counts
+
+    def add(self, color, slot_id):
+        super().add(color, slot_id)
+        bit = 1 << slot_id
+        self.all_occupied |= bit
+
+        # The slot is no longer free for anyone
+        for other in self.frontiers:
+            self.frontiers[other] &= ~bit
+
+        counts = self.get_counts(color)
+        frontier = self.frontiers[color]
+        for n in self.topology.neighbors[slot_id]:
+            counts[n] += 1
+            if counts[n] == 1 and not (self.all_occupied >> n) & 1:
+                frontier |= 1 << n
+        self.frontiers[color] = frontier
+
+    def remove(self, color, slot_id):
+        super().remove(color, slot_id)
+        bit = 1 << slot_id
+        self.all_occupied &= ~bit
+
+        counts = self.get_counts(color)
+        frontier = self.frontiers[color]
+        for n in self.topology.neighbors[slot_id]:
+            counts[n] -= 1
+            if counts[n] == 0:
+                frontier &= ~(1 << n)
+        self.frontiers[color] = frontier
+
+        # The slot is free again for everyone with a peg next to it
+        for other, other_counts in self.adjacent_counts.items():
+            if other_counts[slot_id]:
+                self.frontiers[other] |= bit
+
+    def move(self, color, from_slot, to_slot):
+        self.remove(color, from_slot)
+        self.add(color, to_slot)
+
+    def occupied(self):
+        return self.all_occupied
+
+    def frontier(self, color):
+        return self.frontiers.get(color, 0)
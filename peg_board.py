@@ -1,86 +1,225 @@
 import logging
 import math
-import random
-from PyQt6.QtWidgets import (
-    QGraphicsPolygonItem, QGraphicsEllipseItem, QGraphicsTextItem
-)
-from PyQt6.QtGui import QBrush, QPen, QColor, QPolygonF
-from PyQt6.QtCore import QPointF, Qt
+from PyQt6.QtWidgets import QGraphicsEllipseItem
+from PyQt6.QtGui import QPen, QColor, QPolygonF
+from PyQt6.QtCore import QPointF
 import hex_logic
-from peg_pieces import DICE_FACES, HEX_COLORS, HEX_RADIUS, BOARD_RADIUS, RAIN_COLOR, HOLE_RADIUS
+from peg_model import HEX_RADIUS, HOLE_RADIUS, DIE_RADIUS
 from peg_game_state import GameState
 from PyQt6.QtWidgets import QGraphicsScene
-from peg_pieces import HexTile, Peg
+from peg_model import Peg
+from peg_pieces import PegItem, DieItem, BoardLayerItem, FoodOverlayItem
+import peg_model
+from peg_topology import get_topology
+from peg_fairness import analyze_board
 
 
 class GameBoard(QGraphicsScene):
+    """
+    Qt view of the headless BoardModel held by the GameState.
+    The scene observes the model and never owns game logic.
+    """
     # todo consider how to allow peg sharing location? is that ever possible?
 
-    def __init__(self, game_state: GameState, radius=BOARD_RADIUS, hex_size=HEX_RADIUS, x_center=400, y_center=300):
+    def __init__(self, game_state: GameState, hex_size=HEX_RADIUS, x_center=400, y_center=300):
         super().__init__()
         self.logger = logging.getLogger(self.__class__.__name__)
         self.game_state: GameState = game_state
-        self.radius = radius
+        self.model = game_state.board
         self.hex_size = hex_size
         self.x_center = x_center
         self.y_center = y_center
-        self.hexes = {}  # (q, r): HexTile instance
-        self.pegs = {}  # ((q1,r1),(q2,r2),?): Peg instance
-        self.dice = []  # Die instances
+        self.board_layer = None  # BoardLayerItem: hex fills, peg holes and numbers (cached)
+        self.peg_items = {}  # Peg instance: PegItem
+        self.die_items = {}  # Die instance: DieItem
+        self.die_hexes = {}  # Die instance: (q, r) it is drawn on
+        self.food_overlay = None  # FoodOverlayItem while the food odds heatmap is shown
+        self.show_food_overlay = False
+        self.food_overlay_colors = None  # player colors the shown report was computed for
+
+        # Dirty tracking: model events mark items, refresh() updates only those
+        self.layout_dirty = False
+        self.dirty_tiles = set()
+        self.dirty_pegs = set()
+        self.dirty_dice = set()
 
         self.pointy_top = True
         self.sandbox_mode = False
         self.paint_color = None
+        self.suspend_redraw = False
+        self.dragged_peg = None  # Peg being dragged in sandbox mode
+        self.hover_position = None  # peg position under the dragged peg
+        self.hover_item = None
 
-        self.build_hex_grid()
+        self.model.add_listener(self.on_model_event)
         self.draw_board()
 
+    @property
+    def radius(self):
+        return self.model.radius
+
+    @property
+    def hexes(self):
+        return self.model.hexes  # (q, r): HexTile instance
+
+    @property
+    def pegs(self):
+        return self.model.pegs  # ((q1,r1),(q2,r2),?): Peg instance
+
+    def on_model_event(self, event, obj):
+        self.logger.debug(f'MODEL EVENT {event}')
+        if event == peg_model.EVENT_BOARD_RESET:
+            self.layout_dirty = True
+        elif event == peg_model.EVENT_TILE_CHANGED:
+            self.dirty_tiles.add(obj.coords())
+        elif event in (peg_model.EVENT_PEG_ADDED, peg_model.EVENT_PEG_REMOVED, peg_model.EVENT_PEG_CHANGED):
+            self.dirty_pegs.add(obj)
+        elif event in (peg_model.EVENT_DIE_MOVED, peg_model.EVENT_DIE_CHANGED):
+            self.dirty_dice.add(obj)
+
+        if not self.suspend_redraw:
+            self.refresh()
+
+    def clear_dirty(self):
+        self.layout_dirty = False
+        self.dirty_tiles.clear()
+        self.dirty_pegs.clear()
+        self.dirty_dice.clear()
+
+    def refresh(self):
+        """Apply pending model changes, touching only the affected items."""
+        if self.layout_dirty:
+            self.draw_board()
+            return
+
+        for qr in self.dirty_tiles:
+            self.board_layer.update_tile(self.hexes[qr])
+        # Painting a tile (or seating a player) changes the odds everywhere that color and number tie
+        if self.show_food_overlay and (self.dirty_tiles or self.food_overlay_colors != list(self.game_state.players)):
+            self.update_food_overlay()
+        for peg in self.dirty_pegs:
+            self.update_peg(peg)
+
+        # A moved die restacks both the hex it left and the hex it landed on
+        restack = set()
+        for die in self.dirty_dice:
+            restack.add(self.die_hexes.pop(die, None))
+            restack.add(die.position)
+            item = self.die_items.get(die)
+            if die.position is None and item is not None and item.scene():
+                self.removeItem(item)
+        for qr in restack:
+            if qr in self.hexes:
+                self.update_dice_on_hex(qr)
+
+        self.clear_dirty()
+
     def build_hex_grid(self):
-        self.hexes.clear()
-        for q in range(-self.radius, self.radius + 1):
-            r1 = max(-self.radius, -q - self.radius)
-            r2 = min(self.radius, -q + self.radius)
-            for r in range(r1, r2 + 1):
-                color = random.choice(HEX_COLORS)
-                number = random.choice(DICE_FACES)
-                self.hexes[(q, r)] = HexTile(q, r, color, number)
+        self.model.build_hex_grid()
 
     def hex_to_pixel(self, q, r):
-        if self.pointy_top:
-            x = self.hex_size * math.sqrt(3) * (q + r / 2)
-            y = self.hex_size * 1.5 * r
-        else:
-            x = self.hex_size * 1.5 * q
-            y = self.hex_size * math.sqrt(3) * (r + q / 2)
+        x, y = hex_logic.hex_to_pixel(q, r, self.hex_size, self.pointy_top)
         return x + self.x_center, y + self.y_center
 
+    def pixel_to_hex(self, point: QPointF):
+        """Return the (q, r) of the board hex under a scene point, or None."""
+        qr = hex_logic.pixel_to_hex(point.x() - self.x_center, point.y() - self.y_center,
+                                    self.hex_size, self.pointy_top)
+        return qr if qr in self.hexes else None
+
+    def pixel_to_peg_position(self, point: QPointF):
+        """Return the canonical peg position nearest to a scene point, or None if off the board."""
+        q, r, peg_index = hex_logic.pixel_to_peg(point.x() - self.x_center, point.y() - self.y_center,
+                                                 self.hex_size, self.pointy_top)
+        if (q, r) not in self.hexes:
+            return None
+        topology = get_topology(self.radius, self.pointy_top)
+        return topology.slot_positions[topology.slot_id(q, r, peg_index)]
+
+    def peg_to_pixel(self, peg: Peg):
+        return self.position_to_pixel(peg.position)
+
+    def position_to_pixel(self, position):
+        """Average pixel center of all hexes touched by a peg position = its vertex/edge point."""
+        centers = [self.hex_to_pixel(q, r) for (q, r) in position]
+        avg_x = sum(x for x, _ in centers) / len(centers)
+        avg_y = sum(y for _, y in centers) / len(centers)
+        return QPointF(avg_x, avg_y)
+
+    def die_to_pixel(self, die, stack_index=0):
+        """Dice sit below the hex number, stacked left to right."""
+        x, y = self.hex_to_pixel(*die.position)
+        x += (stack_index - 1) * DIE_RADIUS * 1.2
+        y += self.hex_size * 0.45
+        return QPointF(x, y)
+
+    def get_peg_item(self, peg: Peg):
+        item = self.peg_items.get(peg)
+        if item is None:
+            item = PegItem(peg, board=self)
+            self.peg_items[peg] = item
+        return item
+
+    def get_die_item(self, die):
+        item = self.die_items.get(die)
+        if item is None:
+            item = DieItem(die)
+            self.die_items[die] = item
+        return item
+
     def clear_board(self):
         self.logger.info(f'CLEAR BOARD')
-        for peg in self.pegs.values():
-            peg.remove_from_scene()
-        for player in self.game_state.players.values():
-            for die in player.get_dice():
-                die.remove_from_scene()
+        # Keep persistent peg/die items alive across clear()
+        self.hover_item = None
+        for item in [*self.peg_items.values(), *self.die_items.values()]:
+            if item.scene():
+                self.removeItem(item)
 
         self.clear()
+        self.board_layer = None
+        self.food_overlay = None
+        self.die_hexes = {}
 
     def draw_board(self):
+        """Full rebuild; only needed when the layout or orientation changes."""
         self.clear_board()
         self.logger.info(f'REDRAWING BOARD')
         self.draw_hexes()
+        self.draw_pegs()
+        self.draw_dice()
+        if self.show_food_overlay:
+            self.update_food_overlay()
+        self.clear_dirty()
+
+    def draw_pegs(self):
+        for peg in self.pegs.values():
+            self.update_peg(peg)
 
-        # peg_pool_index = 0
-        # for peg in self.pegs:
-        #     point = peg.to_pixel(hex_size=self.hex_size, pointy_top=self.pointy_top)
-        #     peg.add_to_scene
-        #         q, r, peg_index = peg.position
-        #         x, y = hex_logic.peg_to_pixel(q=q, r=r, peg_index=peg_index, hex_size=self.hex_size, point_top=self.pointy_top)
-        #         peg.add_to_scene(self, x + self.x_center, y + self.y_center)
-        #     else:
-        #         # place in off-board pool
-        #         x = 50 + peg_pool_index * 30
-        #         y = 200  # arbitrary dice pool row
-        #         peg.add_to_scene(self, x, y)
+    def update_peg(self, peg: Peg):
+        item = self.get_peg_item(peg)
+        if peg.position is None or self.pegs.get(peg.position) is not peg:
+            if item.scene():
+                self.removeItem(item)
+            return
+        item.update_visual()
+        item.setFlag(item.GraphicsItemFlag.ItemIsMovable, self.sandbox_mode)
+        item.setPos(self.peg_to_pixel(peg))
+        if not item.scene():
+            self.addItem(item)
+
+    def draw_dice(self):
+        for qr, hex_tile in self.hexes.items():
+            if hex_tile.dice:
+                self.update_dice_on_hex(qr)
+
+    def update_dice_on_hex(self, qr):
+        for i, die in enumerate(self.hexes[qr].dice):
+            item = self.get_die_item(die)
+            item.update_visual()
+            item.setPos(self.die_to_pixel(die, stack_index=i))
+            if not item.scene():
+                self.addItem(item)
+            self.die_hexes[die] = qr
 
     def create_hex_polygon(self, x, y):
         points = []
@@ -92,159 +231,117 @@ class GameBoard(QGraphicsScene):
             points.append(QPointF(px, py))
         return QPolygonF(points)
 
-    def draw_hex(self, x, y, hex_tile):
-        self.logger.debug(f'DRAW {hex_tile.get_name()}')
-
-        hex_item = QGraphicsPolygonItem(self.create_hex_polygon(x, y))
-        hex_item.setBrush(QBrush(QColor(hex_tile.color)))
-        hex_item.setPen(QPen(Qt.GlobalColor.black))
-        self.addItem(hex_item)
-        hex_item.setZValue(-1)
-
-        num_text = QGraphicsTextItem(str(hex_tile.number))
-        num_text.setPos(x - 8, y - 10)
-        self.addItem(num_text)
-
-        # for i, peg in enumerate(hex_tile.pegs):
-        #     angle = math.radians(i * 120)
-        #     px = x + self.hex_size * 0.5 * math.cos(angle)
-        #     py = y + self.hex_size * 0.5 * math.sin(angle)
-        #     peg_item = QGraphicsEllipseItem(px - 6, py - 6, 12, 12)
-        #     peg_item.setBrush(QBrush(QColor(peg.player)))
-        #     self.addItem(peg_item)
-        # for i, die in enumerate(hex_tile.dice):
-        #     die.add_to_scene(self, self.hex_to_pixel)
-
     def scene(self):
         pass
 
     def draw_hexes(self):
-        for (q, r), hex_tile in self.hexes.items():
-            x, y = self.hex_to_pixel(q, r)
-            self.draw_hex(x, y, hex_tile)
-            self.draw_peg_holes(q, r)
-
-    def draw_peg_hole(self, x, y, hole_radius=HOLE_RADIUS):
-        hole = QGraphicsEllipseItem(x - hole_radius, y - hole_radius, 2 * hole_radius, 2 * hole_radius)
-        # hole.setBrush(QBrush(QColor("#888888")))  # dark gray
-        hole.setBrush(QBrush(QColor("#8b4513")))  # warm mahogany
-        hole.setPen(QPen(Qt.GlobalColor.black))
-        hole.setZValue(1)  # Above hexes (-1), below pegs (1, 2)
-        self.addItem(hole)
-
-    def draw_peg_holes(self, q, r, hole_radius=HOLE_RADIUS):
-        """
-        Draws peg hole visuals at all peg positions (0–11) for each hex in `hexes`.
-        - `scene`: QGraphicsScene to draw on
-        - `hexes`: iterable of (q, r) axial hex coordinates
-        - `hex_size`: radius of hexagon
-        - `hole_radius`: visual radius of the peg hole
-        """
-        self.logger.debug(f'DRAW peg holes (r={hole_radius}) around ({q}, {r})')
-        for peg_index in range(12):
-            x, y = hex_logic.peg_to_pixel(q, r, peg_index, hex_size=self.hex_size, point_top=self.pointy_top)
-            x += self.x_center
-            y += self.y_center
-            self.draw_peg_hole(x, y, hole_radius=hole_radius)
+        self.board_layer = BoardLayerItem(self, hole_radius=HOLE_RADIUS)
+        self.addItem(self.board_layer)
+
+    def set_food_overlay(self, visible):
+        """Show or hide the heatmap of each hex's and hole's chance of food per round."""
+        self.show_food_overlay = visible
+        if visible:
+            self.update_food_overlay()
+        elif self.food_overlay is not None:
+            self.removeItem(self.food_overlay)
+            self.food_overlay = None
+
+    def update_food_overlay(self):
+        """Recompute the food odds for the current layout and players (exact, about a millisecond)."""
+        colors = list(self.game_state.players)
+        report = analyze_board(self.model, colors)  # no players: every non-rain tile color plays
+        if self.food_overlay is None:
+            self.food_overlay = FoodOverlayItem(self, hole_radius=HOLE_RADIUS)
+            self.addItem(self.food_overlay)
+        self.food_overlay.set_report(report)
+        self.food_overlay_colors = colors
+        self.logger.debug(f'FOOD OVERLAY FOR {report.colors}')
 
     def mouseReleaseEvent(self, event):
-        """Update HEX color in sandbox mode"""
+        """Drop a dragged peg on the nearest hole, or update HEX color in sandbox mode"""
         if not self.sandbox_mode:
             return
-        clicked_point = event.scenePos()
-        for (q, r), tile in self.hexes.items():
-            x, y = self.hex_to_pixel(q, r)
-            if math.hypot(clicked_point.x() - x, clicked_point.y() - y) < self.hex_size:
-                if self.paint_color is not None:
-                    tile.color = self.paint_color
-                    self.draw_board()
-                else:
-                    self.logger.error(f'paint_color not set')
-                break
+        if self.dragged_peg is not None:
+            super().mouseReleaseEvent(event)
+            self.drop_dragged_peg()
+            return
+        qr = self.pixel_to_hex(event.scenePos())
+        if qr is not None:
+            if self.paint_color is not None:
+                self.model.set_tile_color(*qr, self.paint_color)
+            else:
+                self.logger.error(f'paint_color not set')
 
     def wheelEvent(self, event):
         if not self.sandbox_mode:
             return
-        event.scenePos()
-        point = event.scenePos()
-        for (q, r), tile in self.hexes.items():
-            x, y = self.hex_to_pixel(q, r)
-            if math.hypot(point.x() - x, point.y() - y) < self.hex_size:
-                tile.number = (tile.number % 6) + 1
-                self.draw_board()
-                break
+        qr = self.pixel_to_hex(event.scenePos())
+        if qr is not None:
+            tile = self.hexes[qr]
+            self.model.set_tile_number(*qr, (tile.number % 6) + 1)
+
+    def on_peg_item_moved(self, peg_item, value):
+        """Track the hole under a dragged peg and mark it."""
+        if self.mouseGrabberItem() is not peg_item:
+            return  # moved by setPos(), not by the mouse
+        self.dragged_peg = peg_item.peg
+        position = self.pixel_to_peg_position(value)
+        if position == self.hover_position:
+            return
+        self.hover_position = position
+        self.logger.debug(f'DRAG {peg_item.peg.get_name()} OVER {position}')
+
+        if self.hover_item is None:
+            r = HOLE_RADIUS * 1.6
+            self.hover_item = QGraphicsEllipseItem(-r, -r, 2 * r, 2 * r)
+            self.hover_item.setPen(QPen(QColor(peg_item.peg.color), 2))
+            self.hover_item.setZValue(2)
+            self.addItem(self.hover_item)
+        if position is None or not self.model.is_slot_free(position):
+            self.hover_item.hide()
+        else:
+            self.hover_item.setPos(self.position_to_pixel(position))
+            self.hover_item.show()
+
+    def drop_dragged_peg(self):
+        peg, position = self.dragged_peg, self.hover_position
+        self.dragged_peg = None
+        self.hover_position = None
+        if position is not None and self.model.is_slot_free(position):
+            self.model.move_peg(peg, position)
+        else:
+            self.update_peg(peg)  # snap back
+        if self.hover_item is not None:
+            self.hover_item.hide()
 
     def add_peg_to_board(self, peg: Peg, location):
-
-        self.pegs[location] = peg
-        self.addItem(peg.item)
-        peg.item.setPos(peg.to_pixel(self.hex_size, self.pointy_top))
-
-        # Add to all affected hex tiles
-        for qr in peg.position:
-            if qr in self.hexes:
-                self.hexes[qr].pegs.append(peg)
-
-        # Render if needed
-        self.draw_board()
-        return peg
+        return self.model.add_peg(peg, location)
 
     def remove_peg(self, peg: Peg):
-        # Remove from scene
-        peg.remove_from_scene()
-
-        # Remove from GameBoard peg list
-        if peg in self.pegs.values():
-            self.pegs.pop(peg.position, None)
-
-        # Remove from hex tile (if it's linked to one)
-        for hex_tile in self.hexes_touching_peg(peg):
-            hex_tile.pegs = [p for p in hex_tile.pegs if p is not peg]
-        peg.position = None
+        self.model.remove_peg(peg)
 
     def hexes_touching_peg(self, peg: Peg):
         """Return all hexes touched by the peg's position."""
-        # Example: vertex position between three hexes
-        if peg.position:
-            return [self.hexes[qr] for qr in peg.position if qr in self.hexes]
-        return []
-
-    def assign_rain_die_to_hex(self, die):
-        for (q, r), hex_tile in self.hexes.items():
-            if hex_tile.color == RAIN_COLOR and hex_tile.number == die.value:
-                self.logger.info(f"ASSIGN {die.get_name()} TO {hex_tile.get_name()}")
-
-                original_hex = self.hexes.get(die.position, None)
-                if original_hex:
-                    self.logger.debug(f"REMOVE {die.get_name()} FROM {original_hex.get_name()}")
-                    original_hex.dice.remove(die)
-                hex_tile.dice.append(die)
-                die.position = (q, r)
-                self.draw_board()
-                return
-
-        self.logger.info(f"ASSIGN {die.get_name()} to POOL")
-        die.position = None
-
-    def roll_rain_dice(self):
-        for i, die in enumerate(self.dice):
-            if die.color == RAIN_COLOR:
-                self.logger.info(f'ROLL RAIN DIE {i}')
-                die.reroll()
-
-            self.logger.info(f'ASSIGN RAIN DIE {i}')
-            self.assign_rain_die_to_hex(die=die)
-
-        self.draw_board()  # ensure new roll is reflected
+        return self.model.hexes_touching_peg(peg)
+
+    def run_phase(self, phase_logic):
+        """Run headless phase logic against the model, then redraw once."""
+        self.suspend_redraw = True
+        try:
+            phase_logic(self.game_state)
+        finally:
+            self.suspend_redraw = False
+        self.refresh()
 
     def play_phase(self):
         from peg_rules import play_phase_logic
-        play_phase_logic(self)
+        self.run_phase(play_phase_logic)
 
     def eat_phase(self):
         from peg_rules import eat_phase_logic
-        eat_phase_logic(self)
+        self.run_phase(eat_phase_logic)
 
     def grow_phase(self):
         from peg_rules import grow_phase_logic
-        grow_phase_logic(self)
+        self.run_phase(grow_phase_logic)
@@ -0,0 +1,139 @@
+"""
+EAT phase resolver.
+
+Players take turns in PEG order. On a turn a player pulls dice off one hex
+touched by their pegs, at most as many as the pegs they have touching it
+(or the total size of those pegs in the sized variant). Turns go round until
+nobody can pull any more dice.
+
+Per-hex capacity and remaining dice are indexed once for the hexes that have
+dice, then kept up to date as dice are pulled, so a full EAT costs time
+proportional to the dice in play rather than hexes x pegs x dice.
+"""
+import logging
+
+from peg_game_state import GameState
+from peg_model import EVENT_DICE_PULLED
+from peg_bitboard import iter_bits, popcount
+
+
+def most_dice_first(resolver, color, hex_ids):
+    """Default hex choice: the biggest pull, ties to the lowest hex ID."""
+    return max(hex_ids, key=lambda hex_id: (resolver.pull_size(color, hex_id), -hex_id))
+
+
+class EatResolver:
+    def __init__(self, game_state: GameState, choose_hex=most_dice_first):
+        """
+        Parameters:
+            game_state (GameState): Game to resolve; dice are pulled from its board
+            choose_hex (callable): choose_hex(resolver, color, hex_ids) -> hex_id to pull from
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.game_state = game_state
+        self.board = game_state.board
+        self.topology = self.board.topology
+        self.choose_hex = choose_hex
+
+        self.capacity = {}  # color: {hex_id: max dice per pull}
+        self.hex_dice = {}  # hex_id: dice still on the hex (top of the list is pulled first)
+        self.eaters = {}  # hex_id: colors with capacity on the hex
+        self.available = {}  # color: hex_ids with capacity and dice left
+        self.active = []  # colors taking turns in the current go-round
+        self.next_turn = 0  # index into active of the next player to pull
+        self.n_pulls = 0
+
+        self.build()
+
+    def build(self):
+        """
+        Index the hexes that have dice on them. Capacities come from the board's
+        occupancy bitsets (kept up to date on every peg move), so only hexes
+        with dice are looked at and pegs are never scanned.
+        """
+        topology = self.topology
+        occupancy = self.board.occupancy.occupancy
+        hex_masks = self.board.occupancy.tables.hex_masks
+        slot_positions = topology.slot_positions
+        for color in self.game_state.peg_order:
+            self.capacity[color] = {}
+            self.available[color] = set()
+
+        # Copy each occupied hex's dice once, keeping the board's pull order
+        for player in self.game_state.players.values():
+            for die in player.get_dice():
+                if die.position is None:
+                    continue
+                hex_id = topology.hex_ids[die.position]
+                if hex_id in self.hex_dice:
+                    continue
+                self.hex_dice[hex_id] = list(self.board.hexes[die.position].dice)
+                eaters = self.eaters[hex_id] = []
+                for color in self.game_state.peg_order:
+                    touching = occupancy.get(color, 0) & hex_masks[hex_id]
+                    if not touching:
+                        continue
+                    if self.game_state.sized_pegs:
+                        capacity = sum(self.board.pegs[slot_positions[slot_id]].size
+                                       for slot_id in iter_bits(touching))
+                    else:
+                        capacity = popcount(touching)
+                    self.capacity[color][hex_id] = capacity
+                    self.available[color].add(hex_id)
+                    eaters.append(color)
+
+    def pull_size(self, color, hex_id):
+        return min(self.capacity[color][hex_id], len(self.hex_dice.get(hex_id, ())))
+
+    def can_pull(self, color):
+        return bool(self.available.get(color))
+
+    def pull(self, color, hex_id):
+        """Pull up to the player's capacity from one hex into their hand. Returns the dice."""
+        dice = self.hex_dice[hex_id]
+        n_dice = self.pull_size(color, hex_id)
+        pulled, self.hex_dice[hex_id] = dice[:n_dice], dice[n_dice:]
+
+        player = self.game_state.players[color]
+        for die in pulled:
+            self.board.remove_die_from_hex(die)
+            player.hand.append(die)
+        player.eat_score += n_dice
+        self.n_pulls += 1
+        self.board.notify(EVENT_DICE_PULLED, (color, pulled))
+
+        if not self.hex_dice[hex_id]:
+            for eater in self.eaters[hex_id]:
+                self.available[eater].discard(hex_id)
+        return pulled
+
+    def take_turn(self, color):
+        hex_ids = self.available.get(color)
+        if not hex_ids:
+            return []
+        hex_id = self.choose_hex(self, color, hex_ids)
+        pulled = self.pull(color, hex_id)
+        self.logger.debug(f'{color} PULLED {len(pulled)} FROM HEX {self.topology.hex_coords[hex_id]}')
+        return pulled
+
+    def run(self):
+        """Take turns in PEG order until no player can pull. Returns {color: dice pulled}."""
+        for player in self.game_state.players.values():
+            player.eat_score = 0
+        self.active = [color for color in self.game_state.peg_order if self.can_pull(color)]
+        self.next_turn = 0
+        return self.resume()
+
+    def resume(self):
+        """
+        Continue from the next turn; a copy taken during choose_hex (e.g. by a
+        search bot) finishes the phase from that point.
+        """
+        while self.active:
+            while self.next_turn < len(self.active):
+                color = self.active[self.next_turn]
+                self.next_turn += 1
+                self.take_turn(color)
+            self.active = [color for color in self.active if self.can_pull(color)]
+            self.next_turn = 0
+        return {color: player.eat_score for color, player in self.game_state.players.items()}
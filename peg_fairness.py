@@ -0,0 +1,150 @@
+"""
+Analytical food fairness of a board layout.
+
+For every hex: the exact probability that at least one die lands on it in a
+round, and the expected number of dice. Nothing is simulated:
+    - each player rolls their rain dice; the total (capped at their food dice)
+      is how many food dice they roll
+    - every die lands on a hex matching its color and face, chosen uniformly
+      among ties, or stays in the pool if no hex matches
+
+Given a player's rain faces, that player's dice land independently, and the
+players are independent of each other. For any set S of hexes:
+    P(no die in S) = prod over players of
+                     E_rain[ prod over rain dice (1 - a_S(face)) * (1 - b_S) ** n_food ]
+a_S(face) is the chance that a rain die showing that face lands in S, and b_S
+the chance that one of the player's food dice does. The expectation is read
+off a generating function over the rain total: one row convolution per rain
+die, done for all sets at once.
+
+The sets analyzed are single hexes, the hexes around each peg slot and the
+starting positions (vertex slots, where peg_rules.setup_game puts the
+first pegs).
+"""
+import logging
+
+import numpy as np
+
+from peg_model import BoardModel, RAIN_COLOR, DICE_FACES
+from peg_food import get_incidence, expected_food_dice
+
+
+LOGGER = logging.getLogger(__name__)
+
+N_FACES = len(DICE_FACES)
+
+
+def convolve_rows(a, b):
+    """Row-wise polynomial product of two (n, *) coefficient arrays."""
+    out = np.zeros((a.shape[0], a.shape[1] + b.shape[1] - 1))
+    for j in range(b.shape[1]):
+        out[:, j:j + a.shape[1]] += a * b[:, j:j + 1]
+    return out
+
+
+def landing_chances(board: BoardModel, color):
+    """(N_FACES + 1, n_hexes): chance a die of color showing face f lands on each hex (row 0 unused)."""
+    topology = board.topology
+    chances = np.zeros((N_FACES + 1, topology.n_hexes))
+    for (tile_color, number), tiles in board.tile_index.items():
+        if tile_color != color or not tiles:
+            continue
+        for tile in tiles:
+            chances[number, topology.hex_ids[tile.coords()]] = 1.0 / len(tiles)
+    return chances
+
+
+def no_food_probability(sets, board: BoardModel, colors, n_rain_dice=1, n_food_dice=6):
+    """
+    Parameters:
+        sets (np.ndarray): (n_sets, n_hexes) 0/1 membership of each hex set
+        board (BoardModel): Layout to analyze
+        colors (list): Player colors rolling food dice
+    Returns (n_sets,): exact probability that no die lands in each set in a round.
+    """
+    rain = sets @ landing_chances(board, RAIN_COLOR).T  # (n_sets, faces): a_S(face)
+    # Rain die generating function: coefficient of z ** face = P(face and it misses S)
+    face_poly = (1.0 - rain) / N_FACES
+    face_poly[:, 0] = 0.0
+    rain_poly = np.ones((sets.shape[0], 1))
+    for _ in range(n_rain_dice):
+        rain_poly = convolve_rows(rain_poly, face_poly)
+    n_food = np.minimum(np.arange(rain_poly.shape[1]), n_food_dice)
+
+    p_none = np.ones(sets.shape[0])
+    for color in colors:
+        food = (sets @ landing_chances(board, color).T).sum(axis=1) / N_FACES  # b_S
+        p_none *= (rain_poly * (1.0 - food)[:, None] ** n_food).sum(axis=1)
+    return p_none
+
+
+def expected_dice(sets, board: BoardModel, colors, n_rain_dice=1, n_food_dice=6):
+    """(n_sets,): expected dice landing in each set per round."""
+    rain = (sets @ landing_chances(board, RAIN_COLOR).T).sum(axis=1) / N_FACES
+    n_food = expected_food_dice(n_rain_dice, n_food_dice)
+    expected = rain * n_rain_dice * len(colors)
+    for color in colors:
+        expected += n_food * (sets @ landing_chances(board, color).T).sum(axis=1) / N_FACES
+    return expected
+
+
+class FoodReport:
+    def __init__(self, colors, hex_probability, hex_expected, slot_probability, slot_expected, start_slots):
+        """
+        Parameters:
+            colors (list): Player colors the report assumes
+            hex_probability / hex_expected (np.ndarray): Per hex ID, P(food) and expected dice per round
+            slot_probability / slot_expected (np.ndarray): Same over the hexes around each slot ID
+            start_slots (np.ndarray): Slot IDs of the starting positions
+        """
+        self.colors = colors
+        self.hex_probability = hex_probability
+        self.hex_expected = hex_expected
+        self.slot_probability = slot_probability
+        self.slot_expected = slot_expected
+        self.start_slots = start_slots
+
+    @property
+    def start_probability(self):
+        return self.slot_probability[self.start_slots]
+
+    @property
+    def start_expected(self):
+        return self.slot_expected[self.start_slots]
+
+    def summary(self):
+        start = self.start_probability
+        best, worst = self.start_slots[np.argmax(start)], self.start_slots[np.argmin(start)]
+        return '\n'.join([
+            f'COLORS: {", ".join(self.colors)}',
+            f'HEX P(FOOD): min {self.hex_probability.min():.1%} mean {self.hex_probability.mean():.1%} '
+            f'max {self.hex_probability.max():.1%}',
+            f'START P(FOOD): min {start.min():.1%} (slot {worst}) max {start.max():.1%} (slot {best}) '
+            f'spread {start.max() - start.min():.1%}',
+            f'START EXPECTED DICE: min {self.start_expected.min():.2f} max {self.start_expected.max():.2f}',
+        ])
+
+
+def analyze_board(board: BoardModel, colors=None, n_rain_dice=1, n_food_dice=6):
+    """
+    Food fairness of the board for the given player colors. Without colors,
+    every tile color except rain is assumed to have a player (e.g. while painting).
+    """
+    if not colors:
+        colors = sorted({tile.color for tile in board.hexes.values()} - {RAIN_COLOR})
+    colors = list(colors)
+    topology = board.topology
+    incidence = get_incidence(board.radius)
+    hexes = np.eye(topology.n_hexes)
+    hex_expected = expected_dice(hexes, board, colors, n_rain_dice, n_food_dice)
+
+    report = FoodReport(
+        colors,
+        hex_probability=1.0 - no_food_probability(hexes, board, colors, n_rain_dice, n_food_dice),
+        hex_expected=hex_expected,
+        slot_probability=1.0 - no_food_probability(incidence, board, colors, n_rain_dice, n_food_dice),
+        slot_expected=incidence @ hex_expected,
+        start_slots=np.flatnonzero(np.asarray(topology.slot_is_vertex)),
+    )
+    LOGGER.debug(f'FAIRNESS FOR {colors}: START SPREAD {np.ptp(report.start_probability):.3f}')
+    return report
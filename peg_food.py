@@ -0,0 +1,58 @@
+"""
+Board food model shared by the greedy bot and the fairness analyzer.
+
+Exact per-round expectations of where dice land, from the tile colors and
+numbers and the rain die distribution, plus the slot x hex incidence matrix
+that turns per-hex values into per-slot ones with one matrix product.
+"""
+import functools
+
+import numpy as np
+
+from peg_model import BoardModel, RAIN_COLOR, DICE_FACES
+from peg_topology import get_topology, NO_HEX
+
+
+N_FACES = len(DICE_FACES)
+
+
+@functools.lru_cache(maxsize=None)
+def get_incidence(radius):
+    """(n_slots, n_hexes) float matrix: 1 where the slot touches the on-board hex."""
+    topology = get_topology(radius)
+    slot_hexes = np.asarray(topology.slot_hexes).reshape(topology.n_slots, 3)
+    incidence = np.zeros((topology.n_slots, topology.n_hexes))
+    slots, columns = np.nonzero(slot_hexes != NO_HEX)
+    incidence[slots, slot_hexes[slots, columns]] = 1.0
+    return incidence
+
+
+def expected_food_dice(n_rain_dice=1, n_food_dice=6):
+    """Expected food dice a player rolls: E[min(sum of rain dice, n_food_dice)]."""
+    totals = np.array([1.0])  # distribution of the rain total
+    face = np.full(N_FACES + 1, 1.0 / N_FACES)
+    face[0] = 0.0
+    for _ in range(n_rain_dice):
+        totals = np.convolve(totals, face)
+    return float(np.minimum(np.arange(totals.size), n_food_dice) @ totals)
+
+
+def expected_dice_per_hex(board: BoardModel, colors, n_rain_dice=1, n_food_dice=6):
+    """
+    Expected dice landing on each hex (by hex ID) per round. A die matching
+    several hexes lands on one of them uniformly, so each gets its share.
+    """
+    n_food = expected_food_dice(n_rain_dice, n_food_dice)
+    dice_per_color = {color: 0.0 for color in colors}  # expected dice rolled per round, by color
+    dice_per_color[RAIN_COLOR] = 0.0
+    for color in colors:
+        dice_per_color[color] += n_food
+    dice_per_color[RAIN_COLOR] += n_rain_dice * len(colors)
+
+    expected = np.zeros(board.topology.n_hexes)
+    for hex_id, qr in enumerate(board.topology.hex_coords):
+        tile = board.hexes[qr]
+        n_dice = dice_per_color.get(tile.color, 0.0)
+        if n_dice:
+            expected[hex_id] = n_dice / N_FACES / len(board.tile_index[(tile.color, tile.number)])
+    return expected
@@ -0,0 +1,432 @@
+"""
+Compact binary game log.
+
+A log file is a plain concatenation of games, appended one at a time. Each game
+is a header (board layout, players, RNG seed, record count) followed by fixed
+8-byte records:
+
+    kind (B), player (B), item (B), value (B), target (H), extra (H)
+
+GameRecorder listens to a BoardModel and turns engine events into records;
+GameReplayer rebuilds a headless GameState from a log and re-applies them.
+Peg moves are logged as the remove + add pair the model emits.
+"""
+import logging
+import struct
+
+from peg_game_state import GameState
+from peg_rng import GameRng, SEED_BITS
+from peg_model import (
+    BoardModel, HEX_COLORS, RAIN_COLOR,
+    EVENT_BOARD_RESET, EVENT_TILE_CHANGED, EVENT_PEG_ADDED, EVENT_PEG_REMOVED, EVENT_PEG_CHANGED,
+    EVENT_DIE_MOVED, EVENT_DIE_CHANGED, EVENT_PHASE_CHANGED, EVENT_PEG_ORDER_CHANGED,
+    EVENT_DICE_PULLED, EVENT_HAND_SPENT, EVENT_GAME_OVER,
+)
+
+
+MAGIC = b'PEGL'
+VERSION = 1
+NO_SEED = -1
+
+# magic, version, radius, sized_pegs, n_players, seed, n_palette, n_records
+HEADER = struct.Struct('<4sBBBBqHI')
+PLAYER = struct.Struct('<BBBB')  # palette index, n_pegs, n_rain_dice, n_food_dice
+TILE = struct.Struct('<BB')  # palette index, number
+RECORD = struct.Struct('<BBBBHH')
+
+REC_RESET = 0  # board rebuilt; TILE records for every hex follow
+REC_TILE = 1  # target=hex_id, value=palette index, extra=number
+REC_PHASE = 2  # value=phase code, target=round
+REC_ORDER = 3  # player=n players, item=first rank, target | extra << 16 = player indices, 4 bits each
+REC_ROLL = 4  # player=die owner, item=die index, value=face
+REC_DIE_PLACE = 5  # player=die owner, item=die index, target=hex_id, value=face if just rolled
+REC_DIE_POOL = 6  # player=die owner, item=die index
+REC_PULL = 7  # player=eater, item=die index, value=die owner
+REC_PEG_ADD = 8  # player, item=peg index, target=slot_id
+REC_PEG_REMOVE = 9  # player, item=peg index
+REC_PEG_SIZE = 10  # player, item=peg index, value=size
+REC_WINNER = 11  # player
+REC_SPEND = 12  # player spent their hand in GROW
+
+PHASES = [GameState.PHASE_SANDBOX, GameState.PHASE_PLAY, GameState.PHASE_EAT, GameState.PHASE_GROW]
+PHASE_CODES = {phase: code for code, phase in enumerate(PHASES)}
+
+
+class GameLog:
+    """One decoded game: header fields plus the raw record bytes."""
+
+    def __init__(self, radius, sized_pegs, seed, palette, players, layout, records):
+        """
+        Parameters:
+            radius (int): Board radius
+            sized_pegs (bool): Sized pegs variant
+            seed (int or None): RNG seed the game was played with
+            palette (list): Color names; every color in the log is an index into it
+            players (list): (color, n_pegs, n_rain_dice, n_food_dice) in seat order
+            layout (list): (color, number) per hex, in topology hex order
+            records (bytes): RECORD-packed events
+        """
+        self.radius = radius
+        self.sized_pegs = sized_pegs
+        self.seed = seed
+        self.palette = palette
+        self.players = players
+        self.layout = layout
+        self.records = records
+
+    def __len__(self):
+        return len(self.records) // RECORD.size
+
+    def iter_records(self):
+        return RECORD.iter_unpack(self.records)
+
+    def to_bytes(self):
+        palette_index = {color: i for i, color in enumerate(self.palette)}
+        seed = NO_SEED if self.seed is None else self.seed
+        data = bytearray(HEADER.pack(MAGIC, VERSION, self.radius, self.sized_pegs, len(self.players),
+                                     seed, len(self.palette), len(self)))
+        for color in self.palette:
+            name = color.encode()
+            data += bytes([len(name)]) + name
+        for color, n_pegs, n_rain, n_food in self.players:
+            data += PLAYER.pack(palette_index[color], n_pegs, n_rain, n_food)
+        for color, number in self.layout:
+            data += TILE.pack(palette_index[color], number)
+        data += self.records
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data, offset=0):
+        """Decode the game starting at offset. Returns (GameLog, offset of the next game)."""
+        magic, version, radius, sized_pegs, n_players, seed, n_palette, n_records = \
+            HEADER.unpack_from(data, offset)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'NOT A PEG GAME LOG (magic={magic}, version={version}) AT OFFSET {offset}')
+        offset += HEADER.size
+
+        palette = []
+        for _ in range(n_palette):
+            length = data[offset]
+            palette.append(bytes(data[offset + 1:offset + 1 + length]).decode())
+            offset += 1 + length
+
+        players = []
+        for _ in range(n_players):
+            color, n_pegs, n_rain, n_food = PLAYER.unpack_from(data, offset)
+            players.append((palette[color], n_pegs, n_rain, n_food))
+            offset += PLAYER.size
+
+        layout = []
+        for _ in range(3 * radius * (radius + 1) + 1):
+            color, number = TILE.unpack_from(data, offset)
+            layout.append((palette[color], number))
+            offset += TILE.size
+
+        end = offset + n_records * RECORD.size
+        records = bytes(data[offset:end])
+        return cls(radius, bool(sized_pegs), None if seed == NO_SEED else seed,
+                   palette, players, layout, records), end
+
+
+def read_games(path):
+    """Yield every GameLog in a log file."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    offset = 0
+    while offset < len(data):
+        game_log, offset = GameLog.from_bytes(data, offset)
+        yield game_log
+
+
+def append_games(path, data):
+    """Append encoded games (bytes from GameRecorder.close) to a log file."""
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+class GameRecorder:
+    """
+    Records a game as it is played. Attach after the players are added (and
+    before setup_game to capture the whole game); close() returns the bytes.
+    """
+
+    def __init__(self, game_state: GameState, seed=None):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.game_state = game_state
+        self.board = game_state.board
+        self.seed = seed if seed is not None else game_state.rng.stream_seed
+        if self.seed is not None and not 0 <= self.seed < 1 << SEED_BITS:
+            # Checked here rather than at close(): a root seed passed straight to GameRng can be any int
+            raise ValueError(f'SEED {self.seed} DOES NOT FIT THE LOG HEADER (0 <= seed < 2**{SEED_BITS})')
+        self.records = bytearray()
+        self.dice_on_board = set()  # (owner, die index) of dice the log has on a hex
+        self.pending_pool = []  # dice just taken off a hex; dropped if a PULL follows
+        self.pending_roll = None  # (owner, die index, face); folded into a PLACE that follows
+
+        self.colors = list(game_state.players)
+        self.player_ids = {color: i for i, color in enumerate(self.colors)}
+        self.die_ids = {}  # Die: (owner index, die index)
+        self.peg_ids = {}  # Peg: (owner index, peg index)
+        for owner, player in enumerate(game_state.players.values()):
+            for i, die in enumerate(player.get_dice()):
+                self.die_ids[die] = (owner, i)
+            for i, peg in enumerate(player.pegs):
+                self.peg_ids[peg] = (owner, i)
+
+        self.palette = list(dict.fromkeys([*HEX_COLORS, RAIN_COLOR, *self.colors]))
+        self.palette_index = {}
+        self.layout = [self.tile_key(self.board.hexes[qr]) for qr in self.board.topology.hex_coords]
+
+        self.snapshot()
+        self.board.add_listener(self.on_board_event)
+
+    def color_index(self, color):
+        # The palette is only written out on close, so new colors can join any time
+        index = self.palette_index.get(color)
+        if index is None:
+            if color not in self.palette:
+                self.palette.append(color)
+            index = self.palette_index[color] = self.palette.index(color)
+        return index
+
+    def tile_key(self, tile):
+        self.color_index(tile.color)
+        return tile.color, tile.number
+
+    def write(self, kind, player=0, item=0, value=0, target=0, extra=0):
+        if self.pending_roll is not None:
+            if kind == REC_DIE_PLACE and (player, item) == self.pending_roll[:2]:
+                value = self.pending_roll[2]
+                self.pending_roll = None
+            else:
+                self.flush_roll()
+        if self.pending_pool:
+            if kind == REC_PULL and (value, item) in self.pending_pool:
+                self.pending_pool.remove((value, item))
+            else:
+                self.flush_pool()
+        self.records += RECORD.pack(kind, player, item, value, target, extra)
+
+    def flush_roll(self):
+        if self.pending_roll is not None:
+            self.records += RECORD.pack(REC_ROLL, *self.pending_roll, 0, 0)
+            self.pending_roll = None
+
+    def flush_pool(self):
+        pending, self.pending_pool = self.pending_pool, []
+        for owner, i in pending:
+            self.records += RECORD.pack(REC_DIE_POOL, owner, i, 0, 0, 0)
+
+    def snapshot(self):
+        """Records for state already on the board when recording starts."""
+        for color, player in self.game_state.players.items():
+            for peg in player.get_placed_pegs():
+                self.on_board_event(EVENT_PEG_ADDED, peg)
+                if peg.size != 1:
+                    self.on_board_event(EVENT_PEG_CHANGED, peg)
+            for die in player.get_dice():
+                if die.value is not None:
+                    self.on_board_event(EVENT_DIE_CHANGED, die)
+                if die.position is not None:
+                    self.on_board_event(EVENT_DIE_MOVED, die)
+        self.on_board_event(EVENT_PEG_ORDER_CHANGED, self.game_state)
+
+    def on_board_event(self, event, obj):
+        topology = self.board.topology
+        if event == EVENT_DIE_CHANGED:
+            self.flush_roll()
+            self.pending_roll = (*self.die_ids[obj], obj.value or 0)
+        elif event == EVENT_DIE_MOVED:
+            # Only real removals are logged: PULL implies one, and PLAY returns every die
+            key = self.die_ids[obj]
+            if obj.position is None:
+                if key in self.dice_on_board:
+                    self.dice_on_board.discard(key)
+                    self.pending_pool.append(key)
+            else:
+                self.dice_on_board.add(key)
+                self.write(REC_DIE_PLACE, *key, target=topology.hex_ids[obj.position])
+        elif event == EVENT_DICE_PULLED:
+            color, dice = obj
+            for die in dice:
+                owner, i = self.die_ids[die]
+                self.write(REC_PULL, self.player_ids[color], i, value=owner)
+        elif event == EVENT_PEG_ADDED:
+            owner, i = self.peg_ids[obj]
+            self.write(REC_PEG_ADD, owner, i, target=topology.slot_ids[obj.position])
+        elif event == EVENT_PEG_REMOVED:
+            owner, i = self.peg_ids[obj]
+            self.write(REC_PEG_REMOVE, owner, i)
+        elif event == EVENT_PEG_CHANGED:
+            owner, i = self.peg_ids[obj]
+            self.write(REC_PEG_SIZE, owner, i, value=obj.size)
+        elif event == EVENT_PHASE_CHANGED:
+            self.write(REC_PHASE, value=PHASE_CODES[obj.phase], target=obj.current_round)
+            if obj.phase == GameState.PHASE_PLAY:
+                self.dice_on_board.clear()
+        elif event == EVENT_PEG_ORDER_CHANGED:
+            order = [self.player_ids[color] for color in obj.peg_order]
+            for first in range(0, max(len(order), 1), 8):
+                packed = sum(index << 4 * i for i, index in enumerate(order[first:first + 8]))
+                self.write(REC_ORDER, len(order), first, target=packed & 0xFFFF, extra=packed >> 16)
+        elif event == EVENT_HAND_SPENT:
+            self.write(REC_SPEND, self.player_ids[obj.color])
+        elif event == EVENT_GAME_OVER:
+            self.write(REC_WINNER, self.player_ids[obj.winner])
+        elif event == EVENT_TILE_CHANGED:
+            self.write(REC_TILE, value=self.color_index(obj.color), target=topology.hex_ids[obj.coords()],
+                       extra=obj.number)
+        elif event == EVENT_BOARD_RESET:
+            self.write(REC_RESET)
+            for hex_id, qr in enumerate(topology.hex_coords):
+                self.on_board_event(EVENT_TILE_CHANGED, self.board.hexes[qr])
+
+    def to_log(self):
+        self.flush_roll()
+        self.flush_pool()
+        players = [(color, len(player.pegs), len(player.rain_dice), len(player.food_dice))
+                   for color, player in self.game_state.players.items()]
+        return GameLog(self.board.radius, self.game_state.sized_pegs, self.seed,
+                       self.palette, players, self.layout, bytes(self.records))
+
+    def close(self):
+        """Stop recording and return the encoded game."""
+        self.board.remove_listener(self.on_board_event)
+        return self.to_log().to_bytes()
+
+
+class GameReplayer:
+    """Rebuilds a game from a GameLog on a fresh headless GameState."""
+
+    def __init__(self, game_log: GameLog):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.game_log = game_log
+        self.game_state = None
+        self.colors = []
+        self.dice = []  # [owner index][die index] -> Die
+        self.pegs = []  # [owner index][peg index] -> Peg
+        self.position = 0  # records applied so far
+        self.handlers = {
+            REC_RESET: self.apply_reset,
+            REC_TILE: self.apply_tile,
+            REC_PHASE: self.apply_phase,
+            REC_ORDER: self.apply_order,
+            REC_ROLL: self.apply_roll,
+            REC_DIE_PLACE: self.apply_die_place,
+            REC_DIE_POOL: self.apply_die_pool,
+            REC_PULL: self.apply_pull,
+            REC_PEG_ADD: self.apply_peg_add,
+            REC_PEG_REMOVE: self.apply_peg_remove,
+            REC_PEG_SIZE: self.apply_peg_size,
+            REC_WINNER: self.apply_winner,
+            REC_SPEND: self.apply_spend,
+        }
+        self.reset()
+
+    def reset(self):
+        """Back to the state at the start of the log."""
+        log = self.game_log
+        board = BoardModel(radius=log.radius, rng=GameRng(log.seed))
+        for (q, r), (color, number) in zip(board.topology.hex_coords, log.layout):
+            board.set_tile(q, r, color=color, number=number)
+
+        self.game_state = GameState(board=board, sized_pegs=log.sized_pegs)
+        self.colors = []
+        self.dice = []
+        self.pegs = []
+        for color, n_pegs, n_rain, n_food in log.players:
+            player = self.game_state.add_player(color, n_pegs=n_pegs)
+            player.rain_dice = player.rain_dice[:n_rain]
+            player.food_dice = player.food_dice[:n_food]
+            self.colors.append(color)
+            self.dice.append(player.get_dice())
+            self.pegs.append(player.pegs)
+        self.position = 0
+
+    def apply(self, record):
+        kind, player, item, value, target, extra = record
+        self.handlers[kind](player, item, value, target, extra)
+
+    def run(self, n_records=None):
+        """Apply the next n_records (default: all remaining). Returns the GameState."""
+        records = self.game_log.records
+        start = self.position * RECORD.size
+        end = len(records) if n_records is None else min(len(records), start + n_records * RECORD.size)
+        handlers = self.handlers
+        for kind, player, item, value, target, extra in RECORD.iter_unpack(records[start:end]):
+            handlers[kind](player, item, value, target, extra)
+        self.position = end // RECORD.size
+        return self.game_state
+
+    def apply_reset(self, player, item, value, target, extra):
+        board = self.game_state.board
+        for peg in list(board.pegs.values()):
+            board.remove_peg(peg)
+        board.clear_dice()
+
+    def apply_tile(self, player, item, value, target, extra):
+        q, r = self.game_state.board.topology.hex_coords[target]
+        self.game_state.board.set_tile(q, r, color=self.game_log.palette[value], number=extra)
+
+    def apply_phase(self, player, item, value, target, extra):
+        game_state = self.game_state
+        game_state.phase = PHASES[value]
+        game_state.current_round = target
+        if game_state.phase == GameState.PHASE_PLAY:
+            game_state.board.clear_dice()
+            for p in game_state.players.values():
+                p.hand = []
+        elif game_state.phase == GameState.PHASE_EAT:
+            for p in game_state.players.values():
+                p.eat_score = 0
+
+    def apply_order(self, player, item, value, target, extra):
+        if item == 0:
+            self.game_state.peg_order = []
+        packed = target | extra << 16
+        for i in range(min(player - item, 8)):
+            self.game_state.peg_order.append(self.colors[packed >> 4 * i & 0xF])
+
+    def apply_roll(self, player, item, value, target, extra):
+        die = self.dice[player][item]
+        die.value = value or None
+        self.game_state.board.notify(EVENT_DIE_CHANGED, die)
+
+    def apply_die_place(self, player, item, value, target, extra):
+        if value:
+            self.apply_roll(player, item, value, target, extra)
+        board = self.game_state.board
+        board.assign_die_to_hex(self.dice[player][item], board.hexes[board.topology.hex_coords[target]])
+
+    def apply_die_pool(self, player, item, value, target, extra):
+        self.game_state.board.remove_die_from_hex(self.dice[player][item])
+
+    def apply_pull(self, player, item, value, target, extra):
+        die = self.dice[value][item]
+        self.game_state.board.remove_die_from_hex(die)
+        eater = self.game_state.players[self.colors[player]]
+        eater.hand.append(die)
+        eater.eat_score += 1
+
+    def apply_peg_add(self, player, item, value, target, extra):
+        board = self.game_state.board
+        board.add_peg(self.pegs[player][item], board.topology.slot_positions[target])
+
+    def apply_peg_remove(self, player, item, value, target, extra):
+        self.game_state.board.remove_peg(self.pegs[player][item])
+
+    def apply_peg_size(self, player, item, value, target, extra):
+        peg = self.pegs[player][item]
+        peg.size = value
+        self.game_state.board.notify(EVENT_PEG_CHANGED, peg)
+
+    def apply_spend(self, player, item, value, target, extra):
+        self.game_state.players[self.colors[player]].hand = []
+
+    def apply_winner(self, player, item, value, target, extra):
+        self.game_state.winner = self.colors[player]
+
+
+def replay(game_log: GameLog):
+    """Replay a whole game and return the final GameState."""
+    return GameReplayer(game_log).run()
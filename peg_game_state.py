@@ -1,18 +1,26 @@
-# from typing import Optional
-# from peg_board import GameBoard
-from peg_pieces import Peg, Die
+from peg_model import BoardModel, Peg, Die, RAIN_COLOR, normalize_color
+from peg_movement import ReachabilityService
 import logging
 
 
 class Player:
-    def __init__(self, board, color, name=None, n_pegs=0, n_rain_dice=1, n_food_dice=6):
+    def __init__(self, board, color, name=None, n_pegs=0, n_rain_dice=1, n_food_dice=6, bot=None):
         self.board = board
         self.color = color
         self.name = name
-        self.pegs = [Peg(color=color, size=1, position=None, board=self.board)] * n_pegs
-        self.food_dice = [Die(color=self.color, board=self.board)] * n_food_dice
-        self.rain_dice = [Die(color='blue', board=self.board)] * n_rain_dice
+        self.bot = bot  # None = default rules choices, else an AI (e.g. peg_mcts.MctsBot) makes them
+        self.pegs = [Peg(color=color, size=1, position=None, board=self.board) for _ in range(n_pegs)]
+        self.food_dice = [Die(color=self.color, board=self.board) for _ in range(n_food_dice)]
+        self.rain_dice = [Die(color=RAIN_COLOR, board=self.board) for _ in range(n_rain_dice)]
+        self.hand = []        # Dice pulled during EAT
         self.eat_score = 0    # Most recent EAT score
+        self.pegs_to_place = 0  # New pegs still to place in the current GROW turn
+
+    def __getstate__(self):
+        # Copies (e.g. search rollouts) make the default rules choices; the bot stays with the live game
+        state = self.__dict__.copy()
+        state['bot'] = None
+        return state
 
     def get_dice(self):
         return [*self.rain_dice, *self.food_dice]
@@ -20,6 +28,12 @@ class Player:
     def get_pegs(self):
         return self.pegs
 
+    def get_placed_pegs(self):
+        return [peg for peg in self.pegs if peg.position is not None]
+
+    def get_unplaced_pegs(self):
+        return [peg for peg in self.pegs if peg.position is None]
+
 
 class GameState:
 
@@ -28,26 +42,68 @@ class GameState:
     PHASE_EAT = 'eat'
     PHASE_GROW = 'grow'
 
-    def __init__(self):
+    def __init__(self, board=None, sized_pegs=False, rng=None):
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.board = None
+        self.board = board if board is not None else BoardModel(rng=rng)
+        if rng is not None:
+            self.board.rng = rng
         self.players = {}  # {'color': Player instance}
+        self.peg_order = []  # player colors, first to last
         self.current_round = 0
         self.phase = self.PHASE_SANDBOX
         self.growth_die = None
+        self.sized_pegs = sized_pegs  # README variant: size limits pulls, growth may double a peg
+        self.winner = None  # color of the first player to place all pegs
+        self.grow_queue = []  # colors still to take their GROW turn
+        self.grow_turn = None  # color whose GROW turn is in progress
+        self.reachability = None  # ReachabilityService shared by every GROW turn (see get_reachability)
         # more game state fields...
 
-    def add_player(self, color, name=None):
+    def __getstate__(self):
+        # The reachability service listens to the original board; copies build their own on first use
+        state = self.__dict__.copy()
+        state['reachability'] = None
+        return state
+
+    @property
+    def rng(self):
+        """The game's GameRng (shared with the board)."""
+        return self.board.rng
+
+    def get_reachability(self):
+        """The game's ReachabilityService, attached to the board once so its cache lasts across turns."""
+        if self.reachability is None or self.reachability.board is not self.board:
+            if self.reachability is not None:
+                self.reachability.detach()
+            self.reachability = ReachabilityService(self.board, sized_pegs=self.sized_pegs)
+        return self.reachability
+
+    def add_player(self, color, name=None, n_pegs=0, bot=None):
+        color = normalize_color(color)  # must match tile colors for dice to land
         if color in self.players:
             self.logger.error(f'IGNORING PLAYER COLOR ALREADY ACTIVE: {color}')
             player = None
         else:
-            self.logger.info(f'ADD PLAYER ({color})')
-            player = Player(board=self.board, color=color, name=name)
+            self.logger.info(f'ADD PLAYER ({color}{", BOT" if bot is not None else ""})')
+            player = Player(board=self.board, color=color, name=name, n_pegs=n_pegs, bot=bot)
             self.players[color] = player
+            self.peg_order.append(color)
         return player
 
     def remove_player(self, color):
+        color = normalize_color(color)
         player = self.players.pop(color, None)
+        if color in self.peg_order:
+            self.peg_order.remove(color)
+        if player is not None:
+            for peg in player.get_placed_pegs():
+                self.board.remove_peg(peg)
+            for die in player.get_dice():
+                self.board.remove_die_from_hex(die)
+            if player.bot is not None:
+                player.bot.close()
         self.logger.info(f'REMOVED PLAYER {player}')
         return player
+
+    def get_players_in_order(self):
+        return [self.players[color] for color in self.peg_order]
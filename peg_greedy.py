@@ -0,0 +1,103 @@
+"""
+Greedy bot: a cheap baseline opponent for large simulation sweeps.
+
+Every legal GROW placement is scored in one NumPy pass:
+    scores = incidence @ gain
+where incidence is the precomputed slot x hex matrix (1 where a peg in the
+slot can EAT from the hex) and gain[h] is the expected food value one more
+peg on hex h wins per round. gain is the hex's expected dice per round (exact,
+from the tile colors and numbers and the rain die distribution), weighted by
+what a die of its face is worth in the GROW table. That value is multiplied
+by the share of the hex's dice the extra peg adds: dice are split roughly in
+proportion to the pegs pulling from a hex.
+The bot places on the argmax and pulls the most valuable dice in EAT. A hand
+worth no pegs is spent on movement instead, taking pegs towards the slots
+with the most food value (incidence @ food value). No search, no random draws.
+"""
+import logging
+
+import numpy as np
+
+from peg_game_state import GameState
+from peg_model import DICE_FACES
+from peg_food import get_incidence, expected_dice_per_hex
+from peg_eat import EatResolver
+from peg_grow_table import pegs_gained
+import peg_rules
+
+
+# Pegs a die of each face is worth: a 6 is wild (+1 alone), other faces need a pair
+FACE_VALUES = np.array([0.0] + [pegs_gained([face, face]) / 2 for face in DICE_FACES])
+
+
+def slot_bits(mask, n_slots):
+    """Bitset -> (n_slots,) 0/1 float vector."""
+    data = np.frombuffer(mask.to_bytes((n_slots + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(data, bitorder='little')[:n_slots].astype(float)
+
+
+class GreedyBot:
+    def __init__(self, n_rain_dice=1, n_food_dice=6):
+        """
+        Parameters:
+            n_rain_dice (int): Rain dice per player (for the food model)
+            n_food_dice (int): Food dice per player
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.n_rain_dice = n_rain_dice
+        self.n_food_dice = n_food_dice
+        self.food_key = None  # (layout, colors) the cached food values were computed for
+        self.food_value = None  # (n_hexes,) expected pegs' worth of dice per round
+
+    def close(self):
+        pass
+
+    def hex_food_value(self, game_state: GameState):
+        """Expected dice per hex times their face value, recomputed only when the layout or seats change."""
+        board = game_state.board
+        key = (tuple((tile.color, tile.number) for tile in board.hexes.values()), tuple(sorted(game_state.players)))
+        if key != self.food_key:
+            numbers = np.array([board.hexes[qr].number for qr in board.topology.hex_coords])
+            self.food_value = expected_dice_per_hex(board, game_state.players, self.n_rain_dice,
+                                                    self.n_food_dice) * FACE_VALUES[numbers]
+            self.food_key = key
+        return self.food_value
+
+    def placement_scores(self, game_state: GameState, color):
+        """Score of placing one more peg on every slot (all slots, legal or not)."""
+        board = game_state.board
+        n_slots = board.topology.n_slots
+        incidence = get_incidence(board.radius)
+        own = board.occupancy.occupancy.get(color, 0)
+        mine = slot_bits(own, n_slots) @ incidence  # pegs touching each hex
+        others = slot_bits(board.occupancy.occupied() & ~own, n_slots) @ incidence
+        with np.errstate(invalid='ignore', divide='ignore'):
+            share = np.nan_to_num(mine / (mine + others))
+        gain = self.hex_food_value(game_state) * ((mine + 1) / (mine + 1 + others) - share)
+        return incidence @ gain
+
+    def choose_placement(self, game_state: GameState, player, slot_ids):
+        scores = self.placement_scores(game_state, player.color)
+        slot_ids = np.asarray(slot_ids)
+        return int(slot_ids[np.argmax(scores[slot_ids])])
+
+    def choose_hex(self, resolver: EatResolver, color, hex_ids):
+        """Most pegs' worth of dice in one pull, ties to the lowest hex ID."""
+        hex_coords = resolver.topology.hex_coords
+        hexes = resolver.board.hexes
+        return max(hex_ids, key=lambda hex_id: (resolver.pull_size(color, hex_id)
+                                                * FACE_VALUES[hexes[hex_coords[hex_id]].number], -hex_id))
+
+    def choose_grow_option(self, game_state: GameState, player):
+        """Place when the hand buys a peg; otherwise its faces are only worth as movement range."""
+        if pegs_gained([die.value for die in player.hand]):
+            return peg_rules.GROW_PLACE
+        return peg_rules.GROW_MOVE
+
+    def move_score(self, game_state: GameState, player):
+        """MoveSolver objective: food value of the hexes a peg would touch."""
+        slot_value = get_incidence(game_state.board.radius) @ self.hex_food_value(game_state)
+
+        def score(peg, slot_id):
+            return slot_value[slot_id]
+        return score
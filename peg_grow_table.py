@@ -0,0 +1,142 @@
+"""
+Precomputed GROW table (README, 6s wild).
+
+A set is any group of dice whose non-6 faces all match. It is worth:
+    n 6s                -> n pegs (a single 6 included)
+    any other n of a kind -> n - 1 pegs (a single non-6 is worth nothing)
+
+Every sorted hand of up to MAX_TABLE_DICE dice (924 multisets) maps to its
+best partition into sets, found by searching all partitions, so the rules
+engine and bots get pegs gained with one dict lookup. Bigger hands use the
+closed form the search agrees with (see partition_hand), memoized in a
+bounded cache kept apart from the table.
+"""
+import functools
+import itertools
+from collections import Counter
+
+from peg_model import DICE_FACES
+
+
+WILD_FACE = 6
+MAX_TABLE_DICE = 6
+LARGE_HAND_CACHE_SIZE = 4096  # hands bigger than MAX_TABLE_DICE kept for reuse
+
+
+class GrowResult:
+    def __init__(self, pegs, sets, unused):
+        """
+        Parameters:
+            pegs (int): Pegs gained by spending the hand
+            sets (tuple): Scoring sets, each a sorted tuple of faces
+            unused (tuple): Dice left out of every set (worth nothing)
+        """
+        self.pegs = pegs
+        self.sets = sets
+        self.unused = unused
+
+    def __repr__(self):
+        return f'GrowResult(pegs={self.pegs}, sets={self.sets}, unused={self.unused})'
+
+
+def set_value(dice):
+    """Pegs for spending one group of dice as a set, or None if it is not a valid set."""
+    faces = {value for value in dice if value != WILD_FACE}
+    if len(faces) > 1:
+        return None
+    if not faces:
+        return len(dice)
+    return len(dice) - 1
+
+
+def solve_hand(hand):
+    """
+    Best partition of a sorted hand. Ties prefer fewer dice spent, then fewer sets.
+    Returns (pegs, sets, unused).
+    """
+    return _solve(tuple(sorted(hand)))
+
+
+@functools.lru_cache(maxsize=None)
+def _solve(hand):
+    if not hand:
+        return 0, (), ()
+
+    # The first die is either left unused or goes into a set with some of the rest
+    first, rest = hand[0], hand[1:]
+    pegs, sets, unused = _solve(rest)
+    best = (pegs, -sum(map(len, sets)), -len(sets)), (pegs, sets, (first, *unused))
+
+    for n_others in range(1, len(rest) + 1):
+        for picked in set(itertools.combinations(rest, n_others)):
+            group = (first, *picked)
+            value = set_value(group)
+            if not value:
+                continue
+            remaining = list(rest)
+            for value_picked in picked:
+                remaining.remove(value_picked)
+            pegs, sets, unused = _solve(tuple(remaining))
+            sets = tuple(sorted((group, *sets)))
+            key = (pegs + value, -sum(map(len, sets)), -len(sets))
+            if key > best[0]:
+                best = key, (pegs + value, sets, unused)
+
+    # Single die set (a lone 6)
+    if set_value((first,)):
+        pegs, sets, unused = _solve(rest)
+        sets = tuple(sorted(((first,), *sets)))
+        key = (pegs + 1, -sum(map(len, sets)), -len(sets))
+        if key > best[0]:
+            best = key, (pegs + 1, sets, unused)
+    return best[1]
+
+
+def partition_hand(hand):
+    """
+    Closed-form best partition of a sorted hand: every repeated non-6 face is a
+    set, the 6s join the highest such set (or stand alone), singles are unused.
+    Each 6 is worth +1 wherever it goes, so this matches solve_hand.
+    Returns (pegs, sets, unused).
+    """
+    counts = Counter(hand)
+    n_wild = counts.pop(WILD_FACE, 0)
+    sets = [(face,) * count for face, count in sorted(counts.items()) if count > 1]
+    unused = tuple(face for face, count in sorted(counts.items()) if count == 1)
+    if n_wild:
+        if sets:
+            sets[-1] += (WILD_FACE,) * n_wild
+        else:
+            sets.append((WILD_FACE,) * n_wild)
+    pegs = sum(set_value(group) for group in sets)
+    return pegs, tuple(sorted(sets)), unused
+
+
+def build_table(max_dice=MAX_TABLE_DICE):
+    table = {}
+    for n_dice in range(max_dice + 1):
+        for hand in itertools.combinations_with_replacement(DICE_FACES, n_dice):
+            table[hand] = GrowResult(*solve_hand(hand))
+    return table
+
+
+GROW_TABLE = build_table()
+
+
+@functools.lru_cache(maxsize=LARGE_HAND_CACHE_SIZE)
+def lookup_large(hand):
+    """GrowResult for a sorted hand outside GROW_TABLE (long simulations must not grow the table)."""
+    return GrowResult(*partition_hand(hand))
+
+
+def lookup(values):
+    """GrowResult for a hand of die faces, in any order."""
+    hand = tuple(sorted(values))
+    result = GROW_TABLE.get(hand)
+    if result is None:
+        result = lookup_large(hand)
+    return result
+
+
+def pegs_gained(values):
+    return lookup(values).pegs
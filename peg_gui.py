@@ -12,6 +12,7 @@ from peg_game_state import GameState
 from peg_board import GameBoard
 from peg_player_panel import PlayerDock
 from peg_sandbox_panel import SandboxDock
+from peg_replay_panel import ReplayDock
 import peg_pieces
 from PyQt6.QtGui import QPalette, QColor
 from PyQt6.QtWidgets import QGraphicsView
@@ -68,7 +69,6 @@ class MainWindow(QMainWindow):
 
         self.game_state = GameState()
         self.board = GameBoard(game_state=self.game_state)
-        self.game_state.board = self.board  # chicken/egg...
 
         # self.board_view = QGraphicsView()
         self.board_view = ZoomableGraphicsView()
@@ -137,6 +137,23 @@ class MainWindow(QMainWindow):
         self.sandbox_dock.visibilityChanged.connect(sandbox_dock_toggle_button.setChecked)
         top_bar.addWidget(sandbox_dock_toggle_button)
 
+        # Food odds heatmap over the board (see peg_fairness)
+        self.food_overlay_button = QPushButton("Show Food Odds")
+        self.food_overlay_button.setCheckable(True)
+        self.food_overlay_button.toggled.connect(lambda checked: self.board.set_food_overlay(checked))
+        top_bar.addWidget(self.food_overlay_button)
+
+        # === BOTTOM DOCK (Replay Scrubber) ===
+        self.replay_dock = ReplayDock(main_window=self, parent=self)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.replay_dock)
+
+        replay_dock_toggle_button = QPushButton("Show Replay Panel")
+        replay_dock_toggle_button.setCheckable(True)
+        replay_dock_toggle_button.setChecked(True)
+        replay_dock_toggle_button.toggled.connect(self.replay_dock.setVisible)
+        self.replay_dock.visibilityChanged.connect(replay_dock_toggle_button.setChecked)
+        top_bar.addWidget(replay_dock_toggle_button)
+
         # === BOTTOM PANEL (PEG Turn Order & Log) ===
         bottom_bar = QHBoxLayout()
 
@@ -155,12 +172,28 @@ class MainWindow(QMainWindow):
         self.logger.info(msg)
         self.status_log.addItem(msg)
 
+    def set_game_state(self, game_state):
+        """Show a different game (e.g. a replay) in a new scene; the docks follow it."""
+        old_board = self.board
+        old_board.model.remove_listener(old_board.on_model_event)
+        self.game_state = game_state
+        self.board = GameBoard(game_state=game_state)
+        # Keep the view settings the sandbox dock and top bar still show
+        self.board.sandbox_mode = old_board.sandbox_mode
+        self.board.paint_color = old_board.paint_color
+        self.board.pointy_top = old_board.pointy_top
+        self.board.show_food_overlay = old_board.show_food_overlay
+        self.board.draw_board()  # pegs' movable flag and the orientation apply when items are created
+        self.board_view.setScene(self.board)
+        self.player_dock.game_state = game_state
+        self.update_all()
+
     def update_all(self):
         """Redraw all elements"""
         self.log('Update player dock')
         self.player_dock.update_panel()
         self.log('Update game board')
-        self.board.draw_board()
+        self.board.refresh()
         # self.sandbox_dock.
 
 
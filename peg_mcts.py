@@ -0,0 +1,218 @@
+"""
+Monte Carlo tree search bot.
+
+An MctsBot makes a seat's EAT pull, GROW spend (place or move) and GROW peg
+placement choices. Each decision is a UCB1 search over its options at the
+root. A rollout plays a headless copy of the game on from one option, with
+the default rules choices for every seat, to the end of the round and then
+`horizon` more rounds, and scores the result for the bot's color. Below the
+root every step passes through fresh dice rolls, so deeper nodes would rarely
+be revisited and are not kept.
+
+The search is root-parallel: each worker of the bot's pool searches from the
+same pickled root on its own GameRng substream until the wall-clock budget
+runs out, and the visit counts are summed. A rollout costs one unpickle of the
+root (about a millisecond) plus the rounds it plays.
+
+Root statistics are kept in a transposition table keyed by the position's
+Zobrist hash, so a decision reached again by another pull or placement order
+continues from the rollouts already spent on it.
+"""
+import logging
+import math
+import multiprocessing
+import pickle
+import time
+
+import peg_rules
+from peg_game_state import GameState
+from peg_eat import EatResolver
+from peg_rng import GameRng
+from peg_zobrist import ZobristHasher, TranspositionTable, zobrist_key, FEATURE_OTHER, DEFAULT_TT_CAPACITY
+
+
+DEFAULT_BUDGET_S = 0.2  # wall-clock seconds per decision
+DEFAULT_HORIZON = 3  # rounds rolled out after the one being decided
+EXPLORATION = math.sqrt(2)  # UCB1 exploration constant
+
+DECISION_EAT = 'eat'  # options: hex IDs to pull from
+DECISION_SPEND = 'spend'  # options: peg_rules.GROW_PLACE / GROW_MOVE
+DECISION_PLACE = 'place'  # options: slot IDs for the next new peg
+
+
+def evaluate(game_state: GameState, color):
+    """Reward in [0, 1] for color: 1 for a win, 0 for a loss, else 0.5 moved by the peg lead."""
+    if game_state.winner is not None:
+        return 1.0 if game_state.winner == color else 0.0
+    player = game_state.players[color]
+    placed = len(player.get_placed_pegs())
+    best_other = max((len(other.get_placed_pegs()) for other_color, other in game_state.players.items()
+                      if other_color != color), default=0)
+    return 0.5 + 0.5 * (placed - best_other) / max(len(player.pegs), 1)
+
+
+def play_option(game_state: GameState, resolver: EatResolver, color, decision, option):
+    """Make the decision on a search copy, then finish the current round."""
+    if decision == DECISION_EAT:
+        resolver.pull(color, option)
+        resolver.resume()
+        peg_rules.update_peg_order(game_state)
+        peg_rules.grow_phase_logic(game_state)
+        return
+    player = game_state.players[color]
+    if decision == DECISION_SPEND:
+        peg_rules.spend_hand(game_state, player, option)
+    else:
+        board = game_state.board
+        board.add_peg(player.get_unplaced_pegs()[0], board.topology.slot_positions[option])
+    peg_rules.resume_grow(game_state)
+
+
+def rollout(root, color, decision, option, rng, horizon):
+    """Play one option out from the pickled root on rng. Returns the reward for color."""
+    game_state, resolver = pickle.loads(root)
+    game_state.board.rng = rng
+    play_option(game_state, resolver, color, decision, option)
+    last_round = game_state.current_round + horizon
+    while game_state.winner is None and game_state.current_round < last_round:
+        peg_rules.play_round(game_state)
+    return evaluate(game_state, color)
+
+
+def search(task):
+    """
+    Worker entry point: UCB1 over the options until the budget or the rollout cap runs out.
+    Returns (visits, total rewards) per option.
+    """
+    root, color, decision, options, seed, budget_s, max_rollouts, horizon, exploration = task
+    rng = GameRng(seed)
+    n_options = len(options)
+    order = list(range(n_options))
+    rng.shuffle(order)  # workers try the unvisited options in different orders
+    visits = [0] * n_options
+    totals = [0.0] * n_options
+
+    deadline = math.inf if budget_s is None else time.perf_counter() + budget_s
+    n_rollouts = 0
+    while n_rollouts < max_rollouts and time.perf_counter() < deadline:
+        if n_rollouts < n_options:
+            i = order[n_rollouts]
+        else:
+            log_n = math.log(n_rollouts)
+            i = max(order, key=lambda k: totals[k] / visits[k] + exploration * math.sqrt(log_n / visits[k]))
+        reward = rollout(root, color, decision, options[i], rng.substream(n_rollouts), horizon)
+        visits[i] += 1
+        totals[i] += reward
+        n_rollouts += 1
+    return visits, totals
+
+
+class MctsBot:
+    def __init__(self, budget_s=DEFAULT_BUDGET_S, workers=1, horizon=DEFAULT_HORIZON, max_rollouts=None,
+                 exploration=EXPLORATION, seed=None, tt_capacity=DEFAULT_TT_CAPACITY):
+        """
+        Parameters:
+            budget_s (float or None): Wall-clock seconds per decision; None = stop on max_rollouts only
+            workers (int): Search processes; 1 searches in this process (required inside daemon workers)
+            horizon (int): Rounds rolled out after the current one
+            max_rollouts (int or None): Cap on rollouts per decision (with budget_s=None, searches are reproducible)
+            exploration (float): UCB1 exploration constant
+            seed (int or None): Root seed of the bot's rollout streams
+            tt_capacity (int): Decisions kept in the transposition table
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.budget_s = budget_s
+        self.workers = max(workers, 1)
+        self.horizon = horizon
+        self.max_rollouts = max_rollouts
+        self.exploration = exploration
+        self.rng = GameRng(seed)
+        self.pool = None  # started on the first parallel search
+        self.table = TranspositionTable(tt_capacity)  # position key: (options, visits, totals)
+        self.hasher = None  # ZobristHasher following the game being played
+
+        # Throughput, for tuning budget and workers
+        self.n_decisions = 0
+        self.n_rollouts = 0
+        self.search_seconds = 0.0
+        self.n_transpositions = 0
+
+    @property
+    def rollouts_per_second(self):
+        return self.n_rollouts / self.search_seconds if self.search_seconds else 0.0
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+        if self.hasher is not None:
+            self.hasher.detach()
+            self.hasher = None
+
+    def decision_key(self, game_state: GameState, color, decision):
+        """Zobrist key of a decision: the position, who decides what, and pegs still to place."""
+        if self.hasher is None or self.hasher.game_state is not game_state:
+            if self.hasher is not None:
+                self.hasher.detach()
+            self.hasher = ZobristHasher(game_state)
+        pending = game_state.players[color].pegs_to_place
+        return self.hasher.hash ^ zobrist_key(FEATURE_OTHER, decision, color, pending)
+
+    def choose_hex(self, resolver: EatResolver, color, hex_ids):
+        hex_ids = sorted(hex_ids)
+        if len(hex_ids) == 1:
+            return hex_ids[0]
+        return self.decide((resolver.game_state, resolver), color, DECISION_EAT, hex_ids)
+
+    def choose_grow_option(self, game_state: GameState, player):
+        options = [peg_rules.GROW_PLACE, peg_rules.GROW_MOVE]
+        return self.decide((game_state, None), player.color, DECISION_SPEND, options)
+
+    def move_score(self, game_state: GameState, player):
+        return None  # MoveSolver's default objective; the search already picked MOVE over PLACE
+
+    def choose_placement(self, game_state: GameState, player, slot_ids):
+        if len(slot_ids) == 1:
+            return slot_ids[0]
+        return self.decide((game_state, None), player.color, DECISION_PLACE, list(slot_ids))
+
+    def decide(self, root, color, decision, options):
+        """Search the options from root = (game_state, resolver or None) and return the best."""
+        start_time = time.perf_counter()
+        game_state = root[0]
+        key = self.decision_key(game_state, color, decision)
+        self.table.new_generation(game_state.current_round)
+        prior = self.table.get(key)
+        # Pickled once per decision; every rollout unpickles its own headless copy
+        root = pickle.dumps(root, protocol=pickle.HIGHEST_PROTOCOL)
+        decision_rng = self.rng.spawn()[0]
+        max_rollouts = math.inf if self.max_rollouts is None else math.ceil(self.max_rollouts / self.workers)
+        tasks = [(root, color, decision, options, decision_rng.substream(worker).stream_seed,
+                  self.budget_s, max_rollouts, self.horizon, self.exploration)
+                 for worker in range(self.workers)]
+        if self.workers > 1:
+            if self.pool is None:
+                self.pool = multiprocessing.Pool(processes=self.workers)
+            results = self.pool.map(search, tasks)
+        else:
+            results = [search(tasks[0])]
+
+        visits = [sum(counts) for counts in zip(*(result[0] for result in results))]
+        totals = [sum(rewards) for rewards in zip(*(result[1] for result in results))]
+        n_rollouts = sum(visits)
+        if prior is not None and prior[0] == options:
+            self.n_transpositions += 1
+            visits = [a + b for a, b in zip(visits, prior[1])]
+            totals = [a + b for a, b in zip(totals, prior[2])]
+        self.table.put(key, (options, visits, totals), depth=sum(visits))
+        # Most visited option (the robust child); mean reward breaks ties
+        best = max(range(len(options)), key=lambda i: (visits[i], totals[i] / visits[i] if visits[i] else 0.0))
+
+        elapsed = time.perf_counter() - start_time
+        self.n_decisions += 1
+        self.n_rollouts += n_rollouts
+        self.search_seconds += elapsed
+        self.logger.info(f'{color.upper()} {decision.upper()} {options[best]}: {n_rollouts} ROLLOUTS '
+                         f'IN {elapsed * 1000:.0f} MS ({n_rollouts / elapsed:.0f}/S), '
+                         f'MEAN REWARD {totals[best] / max(visits[best], 1):.3f}')
+        return options[best]
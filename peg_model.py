@@ -0,0 +1,312 @@
+import logging
+import math
+from collections import defaultdict
+
+from peg_topology import get_topology
+from peg_bitboard import TrackedBitboardState, iter_bits
+from peg_rng import GameRng
+
+BOARD_RADIUS = 3
+HEX_RADIUS = 40
+HOLE_RADIUS = 5
+DIE_RADIUS = 10
+HEX_COLORS = [
+    'blue',
+    'orange',
+    'green',
+    # 'darkGreen',
+    # 'darkOrange',
+    'grey',
+    'purple',
+    'darkBlue',
+    'olive',
+    # 'chartreuse',
+    'yellowGreen',
+    # 'lime',
+    'seaGreen',
+    'brown'
+]
+RAIN_COLOR = 'blue'
+COLOR_NAMES = {color.lower(): color for color in HEX_COLORS}  # any case: canonical name
+DICE_FACES = [1, 2, 3, 4, 5, 6]
+MAX_PEG_SIZE = 8
+
+# Events sent to board listeners (e.g. the GameBoard scene)
+EVENT_BOARD_RESET = 'board_reset'
+EVENT_TILE_CHANGED = 'tile_changed'
+EVENT_PEG_ADDED = 'peg_added'
+EVENT_PEG_REMOVED = 'peg_removed'
+EVENT_PEG_CHANGED = 'peg_changed'
+EVENT_DIE_MOVED = 'die_moved'
+EVENT_DIE_CHANGED = 'die_changed'
+# Game-level events, sent through the board by the rules engine
+EVENT_PHASE_CHANGED = 'phase_changed'  # obj: GameState
+EVENT_PEG_ORDER_CHANGED = 'peg_order_changed'  # obj: GameState
+EVENT_DICE_PULLED = 'dice_pulled'  # obj: (color, [Die, ...])
+EVENT_HAND_SPENT = 'hand_spent'  # obj: Player
+EVENT_GAME_OVER = 'game_over'  # obj: GameState
+
+
+def normalize_color(color):
+    """Canonical spelling of a color name (e.g. the dropdown's 'DARKBLUE' -> 'darkBlue'); other names pass through."""
+    return COLOR_NAMES.get(str(color).lower(), color)
+
+
+class HexTile:
+    def __init__(self, q, r, color='yellow', number=1):
+        self.q = q
+        self.r = r
+        self.color = color
+        self.number = number
+        self.pegs = []
+        self.dice = []
+
+    def coords(self):
+        return self.q, self.r
+
+    def get_name(self):
+        return f'HEX-{self.color.upper()}{self.number} at ({self.q}, {self.r})'
+
+    def to_pixel(self, hex_size, pointy_top, x_center, y_center):
+        if pointy_top:
+            x = hex_size * math.sqrt(3) * (self.q + self.r / 2)
+            y = hex_size * 1.5 * self.r
+        else:
+            x = hex_size * 1.5 * self.q
+            y = hex_size * math.sqrt(3) * (self.r + self.q / 2)
+        return x + x_center, y + y_center
+
+
+class Peg:
+    def __init__(self, color, size=1, position=None, board=None):
+        """
+        Parameters:
+            color (str): Player color
+            size (int): Peg size (1, 2, 4, 8, etc.)
+            position (tuple): tuple(sorted((q, r) coordinates)) or None if off-board
+            board (BoardModel): Reference to the board model
+        """
+        self.color = color
+        self.size = size
+        self.position = position  # canonical hex position: tuple(sorted([(q, r), ...]))
+        self.board = board
+
+    def get_name(self):
+        position = 'OFF-BOARD' if self.position is None else str(self.position)
+        return f'PEG-{self.color.upper()}{self.size} at {position}'
+
+    def grow(self):
+        """Double the size (capped at MAX_PEG_SIZE)."""
+        self.size = min(self.size * 2, MAX_PEG_SIZE)
+        if self.board is not None:
+            self.board.notify(EVENT_PEG_CHANGED, self)
+
+
+class Die:
+    def __init__(self, color, value=None, board=None, position=None):
+        """
+        Parameters:
+            color (str): Die color (e.g. 'yellow', 'green')
+            value (int): Face value
+            board (BoardModel): Reference to board model
+            position (tuple): (q, r) hex position or None if in dice pool
+        """
+        self.color = color
+        self.value = value
+        self.board = board
+        self.position = position  # None = dice pool, else (q, r)
+
+    def get_name(self):
+        position = 'POOL' if self.position is None else str(self.position)
+        return f'DIE-{self.color.upper()}{self.value} at {position}'
+
+    def reroll(self, rng=None):
+        """Change to a random new face value, drawn from the board's game RNG by default."""
+        if rng is None:
+            rng = self.board.rng if self.board is not None else GameRng()
+        self.set_value(rng.choice(DICE_FACES))
+
+    def set_value(self, value):
+        """Show a given face (e.g. from a batch roll); listeners see it like a reroll."""
+        self.value = value
+        if self.board is not None:
+            self.board.notify(EVENT_DIE_CHANGED, self)
+
+
+class BoardModel:
+    """
+    Headless PEG board: hex tiles, pegs on the board and dice placed on hexes.
+
+    No Qt objects are created here, so rules can run in worker processes. Views
+    (e.g. GameBoard) register a listener and redraw from the model on events.
+    """
+
+    def __init__(self, radius=BOARD_RADIUS, rng=None):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.radius = radius
+        self.rng = rng if rng is not None else GameRng()  # every random draw of the game comes from here
+        self.topology = get_topology(radius)  # slot IDs and adjacency tables
+        self.hexes = {}  # (q, r): HexTile instance
+        self.pegs = {}  # ((q1,r1),(q2,r2),?): Peg instance
+        self.occupancy = TrackedBitboardState(radius)  # slot bitsets + legal placements per color
+        self.listeners = []  # callables: listener(event, obj)
+        self.slots = set()  # every peg position around the board's hexes
+        self.tile_index = defaultdict(list)  # (color, number): [HexTile, ...]
+
+        self.build_hex_grid()
+
+    def __getstate__(self):
+        # Pickles and deep copies are headless: views stay attached to the original only
+        state = self.__dict__.copy()
+        state['listeners'] = []
+        return state
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def notify(self, event, obj=None):
+        for listener in self.listeners:
+            listener(event, obj)
+
+    def build_hex_grid(self):
+        for peg in self.pegs.values():
+            peg.position = None
+        self.hexes.clear()
+        self.pegs.clear()
+        self.topology = get_topology(self.radius)
+        self.occupancy = TrackedBitboardState(self.radius)
+        for q, r in self.topology.hex_coords:
+            color = self.rng.choice(HEX_COLORS)
+            number = self.rng.choice(DICE_FACES)
+            self.hexes[(q, r)] = HexTile(q, r, color, number)
+        self.build_tile_index()
+        self.build_slots()
+        self.notify(EVENT_BOARD_RESET)
+
+    def build_slots(self):
+        self.slots = set(self.topology.slot_positions)
+
+    def build_tile_index(self):
+        self.tile_index = defaultdict(list)
+        for hex_tile in self.hexes.values():
+            self.tile_index[(hex_tile.color, hex_tile.number)].append(hex_tile)
+
+    def set_tile(self, q, r, color=None, number=None):
+        """
+        Change a tile's color and/or number.
+        Always edit tiles through here so tile_index stays correct.
+        """
+        tile = self.hexes[(q, r)]
+        self.tile_index[(tile.color, tile.number)].remove(tile)
+        if color is not None:
+            tile.color = normalize_color(color)
+        if number is not None:
+            tile.number = number
+        self.tile_index[(tile.color, tile.number)].append(tile)
+        self.notify(EVENT_TILE_CHANGED, tile)
+
+    def set_tile_color(self, q, r, color):
+        self.set_tile(q, r, color=color)
+
+    def set_tile_number(self, q, r, number):
+        self.set_tile(q, r, number=number)
+
+    def add_peg(self, peg: Peg, position):
+        if not self.is_slot_free(position):
+            raise ValueError(f'CANNOT ADD {peg.get_name()} AT {position}: SLOT TAKEN OR OFF THE BOARD')
+        self.logger.debug(f'ADD {peg.get_name()} AT {position}')
+        peg.board = self
+        peg.position = position
+        self.pegs[position] = peg
+        self.occupancy.add(peg.color, self.topology.slot_ids[position])
+
+        # Add to all affected hex tiles
+        for hex_tile in self.hexes_touching_peg(peg):
+            hex_tile.pegs.append(peg)
+
+        self.notify(EVENT_PEG_ADDED, peg)
+        return peg
+
+    def remove_peg(self, peg: Peg):
+        self.logger.debug(f'REMOVE {peg.get_name()}')
+        if self.pegs.get(peg.position) is peg:
+            self.pegs.pop(peg.position)
+            self.occupancy.remove(peg.color, self.topology.slot_ids[peg.position])
+
+        # Remove from hex tile (if it's linked to one)
+        for hex_tile in self.hexes_touching_peg(peg):
+            hex_tile.pegs = [p for p in hex_tile.pegs if p is not peg]
+        peg.position = None
+
+        self.notify(EVENT_PEG_REMOVED, peg)
+
+    def move_peg(self, peg: Peg, position):
+        self.remove_peg(peg)
+        return self.add_peg(peg, position)
+
+    def is_slot_free(self, position):
+        return position in self.slots and position not in self.pegs
+
+    def get_pegs_for_color(self, color):
+        return [peg for peg in self.pegs.values() if peg.color == color]
+
+    def legal_placement_ids(self, color):
+        """Slot IDs where this color may place a new peg (free and adjacent to its pegs)."""
+        return list(iter_bits(self.occupancy.frontier(color)))
+
+    def free_slots_adjacent_to(self, color):
+        """Free positions adjacent to any peg of this color (legal new-peg spots)."""
+        return [self.topology.slot_positions[slot_id] for slot_id in self.legal_placement_ids(color)]
+
+    def hexes_touching_peg(self, peg: Peg):
+        """Return all hexes touched by the peg's position."""
+        if peg.position:
+            return [self.hexes[qr] for qr in peg.position if qr in self.hexes]
+        return []
+
+    def hexes_for_die(self, die: Die):
+        """Return all tiles matching the die's color and face (do not modify the list)."""
+        return self.tile_index.get((die.color, die.value), [])
+
+    def assign_die_to_hex(self, die: Die, hex_tile=None):
+        """
+        Place a die on a hex matching its color and face.
+        If several hexes match and none is given, one is chosen at random.
+        Dice without a matching hex go to the pool (position None).
+        """
+        self.remove_die_from_hex(die)
+
+        if hex_tile is None:
+            candidates = self.hexes_for_die(die)
+            if candidates:
+                hex_tile = self.rng.choice(candidates)
+
+        if hex_tile is None:
+            self.logger.debug(f'ASSIGN {die.get_name()} to POOL')
+        else:
+            self.logger.debug(f'ASSIGN {die.get_name()} TO {hex_tile.get_name()}')
+            hex_tile.dice.append(die)
+            die.position = hex_tile.coords()
+
+        self.notify(EVENT_DIE_MOVED, die)
+        return hex_tile
+
+    def remove_die_from_hex(self, die: Die):
+        """Take a die off its hex (if any) and return it to the pool."""
+        original_hex = self.hexes.get(die.position, None)
+        if original_hex and die in original_hex.dice:
+            self.logger.debug(f'REMOVE {die.get_name()} FROM {original_hex.get_name()}')
+            original_hex.dice.remove(die)
+        if die.position is not None:
+            die.position = None
+            self.notify(EVENT_DIE_MOVED, die)
+
+    def clear_dice(self):
+        """Return every die on the board to the pool."""
+        for hex_tile in self.hexes.values():
+            for die in list(hex_tile.dice):
+                self.remove_die_from_hex(die)
@@ -0,0 +1,210 @@
+"""
+Split a GROW movement budget (sum of spent die faces) across a player's pegs.
+
+Each peg either stays (cost 0) or moves to a free slot it can reach; the step
+count is its cost and the total cost must fit the budget. Plans are scored by a
+pluggable per-peg objective score(peg, slot_id). A greedy plan (best gain per
+step first) is built, then improved by depth-first search with:
+    - dominance pruning of each peg's options
+    - an upper bound memoized over (peg index, remaining range) states
+The search stops at a time budget or node cap and returns the best plan found,
+so a turn costs a few milliseconds even when the exact optimum would not.
+Destinations are evaluated on the board as it is before any peg moves.
+"""
+import functools
+import logging
+import time
+
+from peg_model import BoardModel
+from peg_movement import ReachabilityService
+
+
+DEFAULT_BUDGET_MS = 5.0  # search time per solve, after which the best plan so far is returned
+DEFAULT_MAX_NODES = 50000  # search nodes per solve (a machine-independent cap)
+DEADLINE_CHECK_NODES = 256  # nodes between clock reads
+
+
+class OutOfBudget(Exception):
+    """Raised inside MoveSolver.solve's search when the time budget or node cap runs out."""
+
+
+class MovePlan:
+    def __init__(self, moves, score, range_used):
+        """
+        Parameters:
+            moves (list): (peg, from_slot, to_slot, cost) for every peg that moves
+            score (float): Objective value of the plan (staying pegs included)
+            range_used (int): Total steps spent
+        """
+        self.moves = moves
+        self.score = score
+        self.range_used = range_used
+
+    def __repr__(self):
+        return f'MovePlan(score={self.score}, range_used={self.range_used}, moves={len(self.moves)})'
+
+
+def hexes_touched_objective(board: BoardModel):
+    """Default objective: number of on-board hexes the peg would touch (EAT reach)."""
+    topology = board.topology
+    hex_counts = [len(topology.hexes_for_slot(slot_id)) for slot_id in range(topology.n_slots)]
+
+    def score(peg, slot_id):
+        return hex_counts[slot_id]
+    return score
+
+
+class MoveSolver:
+    def __init__(self, board: BoardModel, reachability: ReachabilityService = None, sized_pegs=False,
+                 budget_ms=DEFAULT_BUDGET_MS, max_nodes=DEFAULT_MAX_NODES):
+        """
+        Parameters:
+            board (BoardModel): Board the pegs are on
+            reachability (ReachabilityService): Shared reachability cache (default: a new one)
+            sized_pegs (bool): Sized pegs hop rules, for a new reachability service
+            budget_ms (float or None): Search time per solve; None = search to the exact optimum
+            max_nodes (int or None): Search nodes per solve; None = no cap
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.board = board
+        self.reachability = reachability or ReachabilityService(board, sized_pegs=sized_pegs)
+        self.budget_ms = budget_ms
+        self.max_nodes = max_nodes
+        self.last_solve_ms = 0.0
+        self.last_nodes = 0
+        self.last_exact = True  # False when the last search stopped at the budget or node cap
+
+    def peg_options(self, peg, move_range, score, keep):
+        """
+        (cost, score, slot_id) options for one peg, staying put included.
+        An option is dropped when `keep` cheaper-or-equal options already score
+        at least as well: with at most keep - 1 other pegs competing for
+        destinations, one of those is always still available.
+        """
+        start = self.board.topology.slot_ids[peg.position]
+        candidates = [(0, score(peg, start), start)]
+        for slot_id, cost in self.reachability.reachable(peg, move_range).items():
+            candidates.append((cost, score(peg, slot_id), slot_id))
+        candidates.sort(key=lambda option: (option[0], -option[1]))
+
+        options = []
+        best_scores = []  # top `keep` scores seen so far, descending
+        for option in candidates:
+            if len(best_scores) >= keep and option[1] <= best_scores[-1]:
+                continue
+            options.append(option)
+            best_scores.append(option[1])
+            best_scores.sort(reverse=True)
+            del best_scores[keep:]
+        options.sort(key=lambda option: -option[1])
+        return options
+
+    @staticmethod
+    def greedy_choice(options, move_range):
+        """
+        Starting plan: every peg stays, then the move with the best gain per step
+        that still fits is taken until none improves. Returns (choice, total).
+        """
+        choice = [next(option for option in choices if option[0] == 0) for choices in options]
+        remaining = move_range
+        used = {slot_id for _, _, slot_id in choice}
+        while True:
+            best = None
+            for i, choices in enumerate(options):
+                current = choice[i]
+                for option in choices:
+                    cost, s, slot_id = option
+                    gain = s - current[1]
+                    if gain <= 0:
+                        break  # options are sorted by score
+                    extra = cost - current[0]
+                    if extra > remaining or slot_id in used:
+                        continue
+                    rate = gain / extra if extra > 0 else float('inf')
+                    if best is None or rate > best[0]:
+                        best = (rate, i, option)
+            if best is None:
+                break
+            _, i, option = best
+            remaining -= option[0] - choice[i][0]
+            used.discard(choice[i][2])
+            used.add(option[2])
+            choice[i] = option
+        return choice, sum(option[1] for option in choice)
+
+    def solve(self, pegs, move_range, score=None):
+        """Return the best MovePlan found for moving `pegs` with a shared budget of move_range."""
+        start_time = time.perf_counter()
+        pegs = [peg for peg in pegs if peg.position is not None]
+        score = score or hexes_touched_objective(self.board)
+        options = [self.peg_options(peg, move_range, score, keep=len(pegs)) for peg in pegs]
+        n_pegs = len(pegs)
+
+        # Per peg, only options that beat every cheaper one matter for the bound
+        pareto = []
+        for choices in options:
+            steps = []
+            for cost, s, _ in sorted(choices, key=lambda option: (option[0], -option[1])):
+                if not steps or s > steps[-1][1]:
+                    steps.append((cost, s))
+            pareto.append(steps)
+
+        @functools.lru_cache(maxsize=None)
+        def upper_bound(i, remaining):
+            """Best total for pegs i.. ignoring destination clashes."""
+            if i == n_pegs:
+                return 0.0
+            return max(s + upper_bound(i + 1, remaining - cost)
+                       for cost, s in pareto[i] if cost <= remaining)
+
+        choice, total = self.greedy_choice(options, move_range) if pegs else ([], 0.0)
+        best = {'score': total, 'choice': choice}
+        chosen = [None] * n_pegs
+        used = set()
+        deadline = None if self.budget_ms is None else start_time + self.budget_ms / 1000
+        max_nodes = self.max_nodes
+        nodes = [0]
+
+        def search(i, remaining, total):
+            nodes[0] += 1
+            if max_nodes is not None and nodes[0] > max_nodes:
+                raise OutOfBudget
+            if deadline is not None and not nodes[0] % DEADLINE_CHECK_NODES and time.perf_counter() > deadline:
+                raise OutOfBudget
+            if i == n_pegs:
+                if best['score'] is None or total > best['score']:
+                    best['score'] = total
+                    best['choice'] = list(chosen)
+                return
+            if best['score'] is not None and total + upper_bound(i, remaining) <= best['score']:
+                return
+            for option in options[i]:
+                cost, s, slot_id = option
+                if cost > remaining or slot_id in used:
+                    continue
+                used.add(slot_id)
+                chosen[i] = option
+                search(i + 1, remaining - cost, total + s)
+                used.discard(slot_id)
+
+        try:
+            search(0, move_range, 0.0)
+            self.last_exact = True
+        except OutOfBudget:
+            self.last_exact = False
+        self.last_nodes = nodes[0]
+
+        moves = []
+        range_used = 0
+        for peg, (cost, _, slot_id) in zip(pegs, best['choice'] or []):
+            if cost:
+                moves.append((peg, self.board.topology.slot_ids[peg.position], slot_id, cost))
+                range_used += cost
+        self.last_solve_ms = (time.perf_counter() - start_time) * 1000
+        return MovePlan(moves, best['score'] or 0.0, range_used)
+
+    def apply(self, plan: MovePlan):
+        """Move the pegs on the board."""
+        slot_positions = self.board.topology.slot_positions
+        for peg, _, to_slot, _ in plan.moves:
+            self.board.move_peg(peg, slot_positions[to_slot])
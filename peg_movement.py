@@ -0,0 +1,128 @@
+"""
+Peg movement reachability for the GROW phase.
+
+A move is a walk over the slot graph: each step to an adjacent slot costs 1
+range. Pegs may hop over (walk through) occupied slots but never stop on one.
+In the sized pegs variant a peg can only hop over pegs of equal or smaller size.
+"""
+import logging
+from collections import deque
+
+from peg_model import (
+    BoardModel, Peg, EVENT_BOARD_RESET, EVENT_PEG_ADDED, EVENT_PEG_REMOVED, EVENT_PEG_CHANGED,
+)
+
+
+class ReachabilityService:
+    """
+    Memoized reachability queries against a BoardModel.
+
+    Each cached search remembers every slot it looked at. When a peg is added,
+    removed, moved or resized, only the searches that looked at that slot are
+    dropped; everything else stays valid.
+    """
+
+    def __init__(self, board: BoardModel, sized_pegs=False):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.board = board
+        self.sized_pegs = sized_pegs
+        self.cache = {}  # (slot_id, size): (max_range, {slot_id: distance}, touched bitset)
+        self.sizes = {}  # slot_id: size of the peg on it
+        self.peg_slots = {}  # Peg: slot_id (positions are cleared before PEG_REMOVED fires)
+        self.hits = 0
+        self.misses = 0
+
+        self.reset()
+        board.add_listener(self.on_board_event)
+
+    def detach(self):
+        self.board.remove_listener(self.on_board_event)
+
+    def reset(self):
+        self.cache.clear()
+        self.sizes.clear()
+        self.peg_slots.clear()
+        for position, peg in self.board.pegs.items():
+            slot_id = self.board.topology.slot_ids[position]
+            self.sizes[slot_id] = peg.size
+            self.peg_slots[peg] = slot_id
+
+    def on_board_event(self, event, obj):
+        if event == EVENT_BOARD_RESET:
+            self.reset()
+        elif event == EVENT_PEG_ADDED:
+            slot_id = self.board.topology.slot_ids[obj.position]
+            self.peg_slots[obj] = slot_id
+            self.sizes[slot_id] = obj.size
+            self.invalidate_slot(slot_id)
+        elif event == EVENT_PEG_REMOVED:
+            slot_id = self.peg_slots.pop(obj, None)
+            if slot_id is not None:
+                self.sizes.pop(slot_id, None)
+                self.invalidate_slot(slot_id)
+        elif event == EVENT_PEG_CHANGED:
+            slot_id = self.peg_slots.get(obj)
+            if slot_id is not None:
+                self.sizes[slot_id] = obj.size
+                self.invalidate_slot(slot_id)
+
+    def invalidate_slot(self, slot_id):
+        bit = 1 << slot_id
+        stale = [key for key, (_, _, touched) in self.cache.items() if touched & bit]
+        for key in stale:
+            del self.cache[key]
+
+    def can_hop(self, slot_id, size):
+        if not self.sized_pegs:
+            return True
+        return self.sizes[slot_id] <= size
+
+    def search(self, start, size, move_range):
+        """BFS from start; returns ({free slot_id: distance}, touched bitset)."""
+        neighbors = self.board.topology.neighbors
+        sizes = self.sizes
+        distances = {start: 0}
+        touched = 1 << start
+        reachable = {}
+        queue = deque([start])
+        while queue:
+            slot_id = queue.popleft()
+            distance = distances[slot_id] + 1
+            if distance > move_range:
+                continue
+            for n in neighbors[slot_id]:
+                if n in distances:
+                    continue
+                touched |= 1 << n
+                if n in sizes and n != start:
+                    if not self.can_hop(n, size):
+                        continue
+                else:
+                    reachable[n] = distance
+                distances[n] = distance
+                queue.append(n)
+        return reachable, touched
+
+    def reachable_slots(self, slot_id, size, move_range):
+        """{slot_id: steps} of every free slot a peg of this size at slot_id can reach."""
+        key = (slot_id, size if self.sized_pegs else 0)
+        entry = self.cache.get(key)
+        if entry is not None and entry[0] >= move_range:
+            self.hits += 1
+            max_range, reachable, _ = entry
+            if max_range == move_range:
+                return reachable
+            return {n: d for n, d in reachable.items() if d <= move_range}
+
+        self.misses += 1
+        reachable, touched = self.search(slot_id, key[1], move_range)
+        self.cache[key] = (move_range, reachable, touched)
+        return reachable
+
+    def reachable(self, peg: Peg, move_range):
+        """{slot_id: steps} reachable by a peg already on the board."""
+        return self.reachable_slots(self.board.topology.slot_ids[peg.position], peg.size, move_range)
+
+    def reachable_positions(self, peg: Peg, move_range):
+        slot_positions = self.board.topology.slot_positions
+        return {slot_positions[n]: d for n, d in self.reachable(peg, move_range).items()}
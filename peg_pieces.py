@@ -1,154 +1,247 @@
 import logging
 from PyQt6.QtCore import QRectF, Qt
-from PyQt6.QtWidgets import QGraphicsEllipseItem, QGraphicsTextItem, QGraphicsRectItem
-from PyQt6.QtGui import QBrush, QColor, QPen
+from PyQt6.QtWidgets import (
+    QGraphicsEllipseItem, QGraphicsTextItem, QGraphicsRectItem, QGraphicsItem, QStyleOptionGraphicsItem
+)
+from PyQt6.QtGui import QBrush, QColor, QPen, QFont, QPainter, QPixmap
 from PyQt6.QtCore import Qt, QPointF
-import random
 import math
+from peg_model import HOLE_RADIUS
+from peg_topology import get_topology
 
-BOARD_RADIUS = 3
-HEX_RADIUS = 40
-HOLE_RADIUS = 5
-DIE_RADIUS = 10
-HEX_COLORS = [
-    'blue',
-    'orange',
-    'green',
-    # 'darkGreen',
-    # 'darkOrange',
-    'grey',
-    'purple',
-    'darkBlue',
-    'olive',
-    # 'chartreuse',
-    'yellowGreen',
-    # 'lime',
-    'seaGreen',
-    'brown'
-]
-RAIN_COLOR = 'blue'
-DICE_FACES = [1, 2, 3, 4, 5, 6]
-
-
-# hex_tile_item.py
-from PyQt6.QtWidgets import QGraphicsPolygonItem, QGraphicsTextItem
-from PyQt6.QtGui import QBrush, QPen, QColor, QPolygonF
-from PyQt6.QtCore import QPointF, Qt
-import math
 
+class BoardLayerItem(QGraphicsItem):
+    """
+    Static board layer: hex fills, every peg hole (each shared vertex/edge once)
+    and every hex number, painted by one item instead of one item per tile,
+    hole and label.
 
-class HexTileItem(QGraphicsPolygonItem):
-    def __init__(self, tile: "HexTile", hex_size: float, pointy_top: bool = True):
-        super().__init__()
-        self.tile = tile
-        self.hex_size = hex_size
-        self.pointy_top = pointy_top
-        self.setZValue(-1)  # Background
-
-        self.setAcceptHoverEvents(True)
-        self.setFlag(self.GraphicsItemFlag.ItemIsSelectable)
-
-        self.text_item = QGraphicsTextItem("", self)
-        self.text_item.setDefaultTextColor(Qt.GlobalColor.black)
-        self.text_item.setZValue(1)
-
-        self.update_polygon()
-        self.update_appearance()
-        self.update_label()
-
-    def update_polygon(self):
-        q, r = self.tile.q, self.tile.r
-        center = self.axial_to_pixel(q, r)
-        self.setPolygon(self.create_hexagon(center))
-
-    def axial_to_pixel(self, q, r):
-        s = self.hex_size
-        if self.pointy_top:
-            x = s * math.sqrt(3) * (q + r/2)
-            y = s * 3/2 * r
-        else:
-            x = s * 3/2 * q
-            y = s * math.sqrt(3) * (r + q/2)
-        return QPointF(x, y)
-
-    def create_hexagon(self, center: QPointF) -> QPolygonF:
-        s = self.hex_size
-        points = []
-        angle_offset = 30 if self.pointy_top else 0
-        for i in range(6):
-            angle_deg = 60 * i + angle_offset
-            angle_rad = math.radians(angle_deg)
-            x = center.x() + s * math.cos(angle_rad)
-            y = center.y() + s * math.sin(angle_rad)
-            points.append(QPointF(x, y))
-        return QPolygonF(points)
-
-    def update_appearance(self):
-        color_map = {
-            "green": QColor(102, 204, 102),
-            "yellow": QColor(255, 255, 153),
-            "blue": QColor(102, 178, 255),
-            "gray": QColor(200, 200, 200),
-        }
-        fill = color_map.get(self.tile.color, QColor("white"))
-        self.setBrush(QBrush(fill))
-        self.setPen(QPen(Qt.GlobalColor.black, 1))
+    The layer is rendered once per zoom bucket into a cached pixmap, so panning
+    and zooming only blit. Sandbox edits repaint just the edited tile's region
+    of each cached pixmap; layout changes call rebuild(), which drops the cache.
+    """
 
-    def update_label(self):
-        self.text_item.setPlainText(str(self.tile.number))
-        bounds = self.polygon().boundingRect()
-        self.text_item.setPos(
-            bounds.center().x() - self.text_item.boundingRect().width() / 2,
-            bounds.center().y() - self.text_item.boundingRect().height() / 2,
-        )
-
-    def mouseDoubleClickEvent(self, event):
-        if hasattr(self.scene(), "on_hex_double_click"):
-            self.scene().on_hex_double_click(self.tile)
-        super().mouseDoubleClickEvent(event)
-
-    def wheelEvent(self, event):
-        if hasattr(self.scene(), "on_hex_wheel_scroll"):
-            self.scene().on_hex_wheel_scroll(self.tile, event.angleDelta().y())
-        super().wheelEvent(event)
-
-
-class HexTile:
-    def __init__(self, q, r, color='yellow', number=1):
-        self.q = q
-        self.r = r
-        self.color = color
-        self.number = number
-        self.pegs = []
-        self.dice = []
-
-    def coords(self):
-        return self.q, self.r
-
-    def get_name(self):
-        return f'HEX-{self.color.upper()}{self.number} at ({self.q}, {self.r})'
-
-    def to_pixel(self, hex_size, pointy_top, x_center, y_center):
-        if pointy_top:
-            x = hex_size * math.sqrt(3) * (self.q + self.r / 2)
-            y = hex_size * 1.5 * self.r
-        else:
-            x = hex_size * 1.5 * self.q
-            y = hex_size * math.sqrt(3) * (self.r + self.q / 2)
-        return x + x_center, y + y_center
+    LABEL_SIZE = 20
+    ZOOM_BUCKETS_PER_OCTAVE = 4  # cache resolutions step by 2 ** (1/4)
+    MAX_CACHED_ZOOMS = 4
+    MAX_PIXMAP_SIZE = 4096  # beyond this, paint directly instead of caching
+
+    def __init__(self, board, hole_radius=HOLE_RADIUS):
+        super().__init__()
+        self.board = board  # GameBoard
+        self.hole_radius = hole_radius
+        self.tile_polygons = []  # (QPolygonF, HexTile) per hex
+        self.hole_points = []  # QPointF per slot ID
+        self.label_points = []  # (QPointF, HexTile) per hex
+        self.bounds = QRectF()
+        self.pixmap_cache = {}  # zoom bucket: QPixmap, oldest first
+        self.cache_enabled = True
+
+        self.tile_pen = QPen(Qt.GlobalColor.black, 1)
+        self.hole_brush = QBrush(QColor("#8b4513"))  # warm mahogany
+        self.hole_pen = QPen(Qt.GlobalColor.black)
+        self.label_font = QFont("Arial", 10)
+
+        self.setZValue(-1)  # Background: below dice (5) and pegs (10)
+        self.setFlag(self.GraphicsItemFlag.ItemUsesExtendedStyleOption)
+        self.rebuild()
+
+    def rebuild(self):
+        """Recompute geometry (board radius, size or orientation changed) and drop the cache."""
+        self.prepareGeometryChange()
+        topology = get_topology(self.board.radius, self.board.pointy_top)
+        self.tile_polygons = []
+        self.label_points = []
+        for q, r in topology.hex_coords:
+            if (q, r) not in self.board.hexes:
+                continue
+            x, y = self.board.hex_to_pixel(q, r)
+            tile = self.board.hexes[(q, r)]
+            self.tile_polygons.append((self.board.create_hex_polygon(x, y), tile))
+            self.label_points.append((QPointF(x, y), tile))
+        self.hole_points = [self.board.position_to_pixel(position) for position in topology.slot_positions]
+
+        bounds = QRectF()
+        for polygon, _ in self.tile_polygons:
+            bounds = bounds.united(polygon.boundingRect())
+        margin = self.hole_radius + 1
+        self.bounds = bounds.adjusted(-margin, -margin, margin, margin)
+        self.invalidate_cache()
+
+    def invalidate_cache(self):
+        self.pixmap_cache.clear()
+        self.update()
+
+    def label_rect(self, point):
+        half = self.LABEL_SIZE / 2
+        return QRectF(point.x() - half, point.y() - half, self.LABEL_SIZE, self.LABEL_SIZE)
+
+    def tile_rect(self, tile):
+        x, y = self.board.hex_to_pixel(tile.q, tile.r)
+        size = self.board.hex_size + self.hole_radius + 1
+        return QRectF(x - size, y - size, 2 * size, 2 * size)
+
+    def update_tile(self, tile):
+        """Repaint one tile's region, in the scene and in every cached pixmap."""
+        rect = self.tile_rect(tile)
+        for bucket, pixmap in self.pixmap_cache.items():
+            painter = QPainter(pixmap)
+            self.setup_cache_painter(painter, bucket, pixmap)
+            painter.setClipRect(rect)
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+            painter.fillRect(rect, Qt.GlobalColor.transparent)
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+            self.paint_static(painter, rect)
+            painter.end()
+        self.update(rect)
+
+    def boundingRect(self):
+        return self.bounds
+
+    def paint_static(self, painter, exposed):
+        r = self.hole_radius
+        exposed = exposed.adjusted(-r, -r, r, r)
+
+        painter.setPen(self.tile_pen)
+        for polygon, tile in self.tile_polygons:
+            if exposed.intersects(polygon.boundingRect()):
+                painter.setBrush(QBrush(QColor(tile.color)))
+                painter.drawPolygon(polygon)
+
+        painter.setBrush(self.hole_brush)
+        painter.setPen(self.hole_pen)
+        for point in self.hole_points:
+            if exposed.contains(point):
+                painter.drawEllipse(point, r, r)
+
+        painter.setFont(self.label_font)
+        painter.setPen(Qt.GlobalColor.black)
+        for point, tile in self.label_points:
+            rect = self.label_rect(point)
+            if exposed.intersects(rect):
+                painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, str(tile.number))
+
+    def zoom_bucket(self, scale):
+        return round(math.log2(max(scale, 1e-6)) * self.ZOOM_BUCKETS_PER_OCTAVE)
+
+    def bucket_scale(self, bucket):
+        return 2 ** (bucket / self.ZOOM_BUCKETS_PER_OCTAVE)
+
+    def setup_cache_painter(self, painter, bucket, pixmap):
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        scale = self.bucket_scale(bucket) * pixmap.devicePixelRatioF()
+        painter.scale(scale, scale)
+        painter.translate(-self.bounds.topLeft())
+
+    def get_cached_pixmap(self, bucket, device_pixel_ratio):
+        pixmap = self.pixmap_cache.pop(bucket, None)
+        if pixmap is None:
+            scale = self.bucket_scale(bucket) * device_pixel_ratio
+            width = math.ceil(self.bounds.width() * scale)
+            height = math.ceil(self.bounds.height() * scale)
+            if not width or not height or max(width, height) > self.MAX_PIXMAP_SIZE:
+                return None
+            pixmap = QPixmap(width, height)
+            pixmap.setDevicePixelRatio(device_pixel_ratio)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            self.setup_cache_painter(painter, bucket, pixmap)
+            self.paint_static(painter, self.bounds)
+            painter.end()
+            while len(self.pixmap_cache) >= self.MAX_CACHED_ZOOMS:
+                self.pixmap_cache.pop(next(iter(self.pixmap_cache)))
+        self.pixmap_cache[bucket] = pixmap  # most recently used last
+        return pixmap
+
+    def paint(self, painter, option, widget=None):
+        pixmap = None
+        if self.cache_enabled:
+            scale = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+            device_pixel_ratio = painter.device().devicePixelRatioF() if painter.device() else 1.0
+            pixmap = self.get_cached_pixmap(self.zoom_bucket(scale), device_pixel_ratio)
+
+        if pixmap is None:
+            self.paint_static(painter, option.exposedRect)
+            return
+
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        source = QRectF(0, 0, pixmap.width(), pixmap.height())
+        painter.drawPixmap(self.bounds, pixmap, source)
+
+
+class FoodOverlayItem(QGraphicsItem):
+    """
+    Heatmap of a FoodReport (see peg_fairness) over the board layer. Each hex
+    is tinted by its chance of receiving food in a round and labelled with it;
+    each peg hole gets a dot for the chance that any of its hexes gets food.
+    Colors run from red (no food) to green (the board's best hex or hole).
+    """
+
+    LABEL_HEIGHT = 14
+
+    def __init__(self, board, hole_radius=HOLE_RADIUS):
+        super().__init__()
+        self.board = board  # GameBoard
+        self.hole_radius = hole_radius
+        self.report = None
+        self.label_font = QFont("Arial", 8)
+        self.setZValue(1)  # Above the board layer (-1), below dice (5) and pegs (10)
+        self.setAcceptedMouseButtons(Qt.MouseButton.NoButton)  # sandbox painting clicks reach the scene
+
+    def set_report(self, report):
+        self.prepareGeometryChange()
+        self.report = report
+        self.update()
+
+    def boundingRect(self):
+        layer = self.board.board_layer
+        return layer.boundingRect() if layer is not None else QRectF()
+
+    @staticmethod
+    def heat_color(value, alpha):
+        color = QColor.fromHsvF(max(0.0, min(value, 1.0)) / 3, 0.9, 0.9)  # hue: red 0 -> green 1/3
+        color.setAlphaF(alpha)
+        return color
+
+    def paint(self, painter, option, widget=None):
+        if self.report is None:
+            return
+        board = self.board
+        topology = get_topology(board.radius, board.pointy_top)
+        hex_best = max(self.report.hex_probability.max(), 1e-9)
+        slot_best = max(self.report.slot_probability.max(), 1e-9)
+
+        painter.setFont(self.label_font)
+        for hex_id, (q, r) in enumerate(topology.hex_coords):
+            probability = self.report.hex_probability[hex_id]
+            x, y = board.hex_to_pixel(q, r)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(self.heat_color(probability / hex_best, 0.45))
+            painter.drawPolygon(board.create_hex_polygon(x, y))
+            painter.setPen(Qt.GlobalColor.black)
+            rect = QRectF(x - board.hex_size / 2, y - board.hex_size * 0.6, board.hex_size, self.LABEL_HEIGHT)
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, f'{probability:.0%}')
+
+        r = self.hole_radius * 0.7
+        painter.setPen(QPen(Qt.GlobalColor.black, 0.5))
+        for slot_id, position in enumerate(topology.slot_positions):
+            painter.setBrush(self.heat_color(self.report.slot_probability[slot_id] / slot_best, 0.9))
+            painter.drawEllipse(board.position_to_pixel(position), r, r)
 
 
 class PegItem(QGraphicsEllipseItem):
-    def __init__(self, peg, radius=10):
+    def __init__(self, peg, board, radius=10):
         super().__init__()
-        self.peg = peg  # back-reference
+        self.peg = peg  # back-reference to model Peg
+        self.board = board  # GameBoard scene observing the model
         self.radius = radius
 
         self.setRect(QRectF(-radius, -radius, 2*radius, 2*radius))
         self.setBrush(QBrush(QColor(peg.color)))
         self.setPen(QPen(Qt.GlobalColor.black, 1))
         self.setZValue(10)  # ensure it's above the board
-        self.setFlag(self.GraphicsItemFlag.ItemIsMovable, peg.board.sandbox_mode)
+        self.setFlag(self.GraphicsItemFlag.ItemIsMovable, board.sandbox_mode)
         self.setFlag(self.GraphicsItemFlag.ItemSendsScenePositionChanges)
 
         # Tooltip
@@ -160,54 +253,11 @@ class PegItem(QGraphicsEllipseItem):
 
     def itemChange(self, change, value):
         if change == self.GraphicsItemChange.ItemPositionHasChanged:
-            if self.peg.board.sandbox_mode:
-                self.peg.update_from_position(value)
+            if self.board.sandbox_mode:
+                self.board.on_peg_item_moved(self, value)
         return super().itemChange(change, value)
 
 
-class Peg:
-    def __init__(self, color, size, position, board):
-        """
-        Parameters:
-            color (str): Player color
-            size (int): Peg size (1, 2, 4, 8, etc.)
-            position (tuple): tuple(sorted((q, r) coordinates))
-            board (GameBoard): Reference to the game board
-        """
-        self.color = color
-        self.size = size
-        self.position = position  # canonical hex position: tuple(sorted([(q, r), ...]))
-        self.board = board
-
-        # GUI item
-        self.item = PegItem(self)
-
-    def grow(self):
-        """Double the size (max size can be enforced elsewhere)."""
-        self.size = min(self.size * 2, 8)
-        self.item.update_visual()
-
-    def move_to(self, new_position):
-        """Update logic position and redraw the peg."""
-        self.position = new_position
-        self.item.setPos(self.to_pixel(self.board.hex_size, self.board.pointy_top))
-
-    def to_pixel(self, hex_size, pointy_top):
-        """Convert self.position (canonicalized hexes) into a screen coordinate for drawing."""
-        if not self.position:
-            return QPointF(0, 0)
-
-        # Get average pixel center of all touched hexes
-        centers = [self.board.hex_to_pixel(q, r, hex_size, pointy_top) for (q, r) in self.position]
-        avg_x = sum(pt.x() for pt in centers) / len(centers)
-        avg_y = sum(pt.y() for pt in centers) / len(centers)
-        return QPointF(avg_x, avg_y)
-
-    def remove_from_scene(self):
-        """Remove peg visual from scene."""
-        if self.item.scene():
-            self.board.removeItem(self.item)
-
 # class Peg:
 #     def __init__(self, color: str, size: int = 1, position=None):
 #         self.color = color  # e.g., 'Red', 'Blue'
@@ -301,7 +351,7 @@ class Peg:
 
 
 from PyQt6.QtWidgets import QGraphicsRectItem, QGraphicsTextItem
-from PyQt6.QtGui import QBrush, QPen, QColor, QFont
+from PyQt6.QtGui import QBrush, QPen, QColor
 from PyQt6.QtCore import QRectF, Qt
 
 
@@ -327,48 +377,10 @@ class DieItem(QGraphicsRectItem):
 
     def update_visual(self):
         self.setBrush(QBrush(QColor(self.die.color)))
-        self.label.setPlainText(self.die.value)
+        self.label.setPlainText(str(self.die.value))
         self.setToolTip(f"Die: {self.die.color} {self.die.value}")
 
 
-class Die:
-    def __init__(self, color, value=None, board=None, position=None):
-        """
-        Parameters:
-            color (str): Die color (e.g. 'yellow', 'green')
-            value (str/int): Face value
-            board (GameBoard): Reference to board
-            position (tuple): (q, r) hex position or None if in dice pool
-        """
-        self.color = color
-        self.value = value
-        self.board = board
-        self.position = position  # None = dice pool, else (q, r)
-
-        # GUI item
-        self.item = DieItem(self)
-
-    def reroll(self):
-        """Change to a random new face value."""
-        self.value = random.randint(1, 6)  # or use custom face set
-        self.item.update_visual()
-
-    def move_to(self, position):
-        """Update hex position and redraw."""
-        self.position = position
-        if position:
-            pos = self.board.hex_to_pixel(*position, self.board.hex_size, self.board.pointy_top)
-            self.item.setPos(pos)
-        else:
-            # Off-board pool — you may define a grid/pool position logic
-            self.item.setPos(self.board.get_pool_position(self))
-
-    def remove_from_scene(self):
-        """Remove die from board's scene."""
-        if self.item.scene():
-            self.board.removeItem(self.item)
-
-
 # class Die:
 #     def __init__(self, color='yellow', value=None, player=None):
 #         self.logger = logging.getLogger(self.__class__.__name__)
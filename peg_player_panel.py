@@ -6,6 +6,124 @@ from PyQt6.QtGui import QColor, QPixmap, QPainter
 from PyQt6.QtCore import Qt, QSize
 import logging
 
+from peg_reroll import advise, MAX_REROLL_DICE
+
+
+ICON_SIZE = 20
+MAX_HINT_DICE = 2 * MAX_REROLL_DICE  # bigger hands get no hint (solving them costs several ms on the UI thread)
+
+# Rendered die/peg icons, shared by every row: (kind, color, value or size, placed): QPixmap
+ICON_CACHE = {}
+
+
+def get_icon(kind, color, value, placed):
+    key = (kind, color, value, placed)
+    pix = ICON_CACHE.get(key)
+    if pix is None:
+        pix = make_icon(kind, color, value, placed)
+        ICON_CACHE[key] = pix
+    return pix
+
+
+def make_icon(kind, color, value, placed):
+    size = ICON_SIZE
+    pix = QPixmap(size, size)
+    pix.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(pix)
+    color = QColor(color)
+    if placed:
+        color.setAlpha(100)  # Greyed out if placed
+    painter.setBrush(color)
+    painter.setPen(Qt.GlobalColor.black)
+    if kind == 'die':
+        painter.drawRect(2, 2, size - 4, size - 4)
+    else:
+        painter.drawEllipse(2, 2, size - 4, size - 4)
+    painter.drawText(pix.rect(), Qt.AlignmentFlag.AlignCenter, str(value or "?"))
+    painter.end()
+    return pix
+
+
+class IconLabel(QLabel):
+    """Die/peg icon that only swaps its pixmap when the rendered state changes."""
+
+    def __init__(self):
+        super().__init__()
+        self.key = None
+        self.setFixedSize(QSize(ICON_SIZE + 2, ICON_SIZE + 2))
+
+    def set_die(self, die):
+        self.set_icon(('die', die.color, die.value, die.position is not None),
+                      f"Die: {die.color} {die.value}")
+
+    def set_peg(self, peg):
+        self.set_icon(('peg', peg.color, peg.size, peg.position is not None),
+                      f"Peg: {peg.color} size {peg.size}")
+
+    def set_icon(self, key, tooltip):
+        if key == self.key:
+            return
+        self.key = key
+        self.setPixmap(get_icon(*key))
+        self.setToolTip(tooltip)
+
+
+class PlayerRow(QFrame):
+    """One player's row of dice and pegs, updated in place."""
+
+    def __init__(self, player):
+        super().__init__()
+        self.setFrameShape(QFrame.Shape.StyledPanel)
+        self.layout = QHBoxLayout(self)
+        self.layout.setContentsMargins(5, 2, 5, 2)
+        self.layout.setSpacing(4)
+
+        # Color block
+        color_box = QLabel()
+        color_box.setFixedSize(ICON_SIZE, ICON_SIZE)
+        pix = QPixmap(ICON_SIZE, ICON_SIZE)
+        pix.fill(QColor(player.color))
+        color_box.setPixmap(pix)
+        self.layout.addWidget(color_box)
+
+        self.die_labels = []
+        self.peg_labels = []
+        self.hint_label = QLabel()  # GROW reroll hint for the dice in hand
+        self.layout.addWidget(self.hint_label)
+        self.update_row(player)
+
+    def resize_labels(self, labels, count, insert_at):
+        while len(labels) < count:
+            label = IconLabel()
+            self.layout.insertWidget(insert_at + len(labels), label)
+            labels.append(label)
+        while len(labels) > count:
+            labels.pop().setParent(None)
+
+    def update_row(self, player):
+        dice = player.get_dice()  # rain dice, then food dice
+        self.resize_labels(self.die_labels, len(dice), insert_at=1)
+        self.resize_labels(self.peg_labels, len(player.pegs), insert_at=1 + len(self.die_labels))
+
+        for label, die in zip(self.die_labels, dice):
+            label.set_die(die)
+        for label, peg in zip(self.peg_labels, player.pegs):
+            label.set_peg(peg)
+        self.update_hint(player)
+
+    def update_hint(self, player):
+        if not player.hand:
+            self.hint_label.clear()
+            return
+        if len(player.hand) > MAX_HINT_DICE:
+            self.hint_label.setText("Reroll: ?")
+            self.hint_label.setToolTip(f"No hint for hands of more than {MAX_HINT_DICE} dice")
+            return
+        advice = advise([die.value for die in player.hand])
+        reroll = ' '.join(map(str, advice.reroll)) or 'nothing'
+        self.hint_label.setText(f"Reroll: {reroll}")
+        self.hint_label.setToolTip(f"Expected pegs {advice.expected_pegs:.2f} (keep {advice.keep})")
+
 
 class PlayerDock(QDockWidget):
     def __init__(self, game_state, parent=None):
@@ -19,88 +137,26 @@ class PlayerDock(QDockWidget):
         self.layout = QVBoxLayout(self.widget)
         self.layout.setContentsMargins(5, 5, 5, 5)
         self.layout.setSpacing(10)
+        self.rows = {}  # player color: PlayerRow
 
         self.setWidget(self.widget)
 
     def update_panel(self):
         self.logger.debug(f'update_panel')
 
-        # Clear existing
-        for i in reversed(range(self.layout.count())):
-            item = self.layout.itemAt(i).widget()
-            if item:
-                item.setParent(None)
+        # Drop rows of removed players
+        for color in list(self.rows):
+            if color not in self.game_state.players:
+                self.rows.pop(color).setParent(None)
 
-        for player in self.game_state.players.values():
-            self.layout.addWidget(self.create_player_row(player))
+        for color, player in self.game_state.players.items():
+            row = self.rows.get(color)
+            if row is None:
+                self.rows[color] = self.create_player_row(player)
+                self.layout.addWidget(self.rows[color])
+            else:
+                row.update_row(player)
 
     def create_player_row(self, player):
         self.logger.debug(f'create_player_row')
-
-        row = QFrame()
-        row.setFrameShape(QFrame.Shape.StyledPanel)
-        layout = QHBoxLayout(row)
-        layout.setContentsMargins(5, 2, 5, 2)
-        layout.setSpacing(4)
-
-        # Color block
-        color_box = QLabel()
-        color_box.setFixedSize(20, 20)
-        pix = QPixmap(20, 20)
-        pix.fill(QColor(player.color))
-        color_box.setPixmap(pix)
-        layout.addWidget(color_box)
-
-        # Rain Dice
-        for die in player.rain_dice:
-            layout.addWidget(self.make_die_icon(die))
-
-        # Food Dice
-        for die in player.food_dice:
-            layout.addWidget(self.make_die_icon(die))
-
-        # Pegs
-        for peg in player.pegs:
-            layout.addWidget(self.make_peg_icon(peg))
-
-        return row
-
-    def make_die_icon(self, die):
-        size = 20
-        pix = QPixmap(size, size)
-        pix.fill(Qt.GlobalColor.transparent)
-        painter = QPainter(pix)
-        color = QColor(die.color)
-        if die.position is not None:
-            color.setAlpha(100)  # Greyed out if placed
-        painter.setBrush(color)
-        painter.setPen(Qt.GlobalColor.black)
-        painter.drawRect(2, 2, size - 4, size - 4)
-        painter.drawText(pix.rect(), Qt.AlignmentFlag.AlignCenter, str(die.value or "?"))
-        painter.end()
-
-        label = QLabel()
-        label.setPixmap(pix)
-        label.setFixedSize(QSize(size + 2, size + 2))
-        label.setToolTip(f"Die: {die.color} {die.value}")
-        return label
-
-    def make_peg_icon(self, peg):
-        size = 20
-        pix = QPixmap(size, size)
-        pix.fill(Qt.GlobalColor.transparent)
-        painter = QPainter(pix)
-        color = QColor(peg.color)
-        if peg.position is not None:
-            color.setAlpha(100)  # Greyed out if placed
-        painter.setBrush(color)
-        painter.setPen(Qt.GlobalColor.black)
-        painter.drawEllipse(2, 2, size - 4, size - 4)
-        painter.drawText(pix.rect(), Qt.AlignmentFlag.AlignCenter, str(peg.size))
-        painter.end()
-
-        label = QLabel()
-        label.setPixmap(pix)
-        label.setFixedSize(QSize(size + 2, size + 2))
-        label.setToolTip(f"Peg: {peg.color} size {peg.size}")
-        return label
+        return PlayerRow(player)
@@ -0,0 +1,154 @@
+"""
+Seekable replay of a logged game.
+
+ReplayTimeline replays the log once to index where every round starts and to
+take a full-state keyframe every `keyframe_interval` rounds. Seeking restores
+the nearest keyframe at or before the target (only changed pegs, dice and tiles
+are touched) and applies the few records in between, instead of replaying from
+the first move. All changes go through the BoardModel, so a GameBoard listening
+to it can batch them into one refresh (see GameBoard.run_phase).
+"""
+import bisect
+import logging
+
+from peg_game_log import GameLog, GameReplayer, REC_PHASE, PHASE_CODES
+from peg_game_state import GameState
+from peg_model import EVENT_DIE_CHANGED, EVENT_PEG_CHANGED
+
+
+DEFAULT_KEYFRAME_INTERVAL = 10  # rounds
+
+
+class Keyframe:
+    def __init__(self, position, state):
+        """
+        Parameters:
+            position (int): Records applied when the keyframe was taken
+            state (tuple): Output of ReplayTimeline.capture()
+        """
+        self.position = position
+        self.state = state
+
+
+class ReplayTimeline:
+    def __init__(self, game_log: GameLog, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.game_log = game_log
+        self.keyframe_interval = keyframe_interval
+        self.replayer = GameReplayer(game_log)
+        self.game_state = self.replayer.game_state  # stays the same object for the whole replay
+        self.round_starts = []  # round_starts[r] = position after round r (setup is round 0)
+        self.keyframes = []  # Keyframe, in position order
+        self.keyframe_positions = []
+
+        self.index_rounds()
+        self.build_keyframes()
+
+    @property
+    def n_rounds(self):
+        return len(self.round_starts) - 1
+
+    @property
+    def position(self):
+        return self.replayer.position
+
+    def index_rounds(self):
+        play = PHASE_CODES[GameState.PHASE_PLAY]
+        self.round_starts = []
+        # Round r ends where the PLAY phase of round r + 1 begins
+        for i, (kind, _, _, value, _, _) in enumerate(self.game_log.iter_records()):
+            if kind == REC_PHASE and value == play:
+                self.round_starts.append(i)
+        self.round_starts.append(len(self.game_log))
+
+    def build_keyframes(self):
+        """One pass over the whole log, snapshotting every keyframe_interval rounds."""
+        self.keyframes = [Keyframe(0, self.capture())]
+        for rnd in range(0, len(self.round_starts), self.keyframe_interval):
+            position = self.round_starts[rnd]
+            if position == self.keyframes[-1].position:
+                continue  # e.g. a log that opens with round 1's PLAY record
+            self.replayer.run(position - self.replayer.position)
+            self.keyframes.append(Keyframe(position, self.capture()))
+        self.keyframe_positions = [keyframe.position for keyframe in self.keyframes]
+        self.logger.debug(f'{len(self.keyframes)} KEYFRAMES FOR {len(self.game_log)} RECORDS')
+
+    def capture(self):
+        """Full game state as plain tuples (objects referenced by replayer indices)."""
+        replayer = self.replayer
+        game_state = self.game_state
+        board = game_state.board
+        die_ids = {die: (owner, i) for owner, dice in enumerate(replayer.dice) for i, die in enumerate(dice)}
+        tiles = tuple((tile.color, tile.number) for tile in board.hexes.values())
+        pegs = tuple((peg.position, peg.size) for pegs in replayer.pegs for peg in pegs)
+        dice = tuple(die.value for dice in replayer.dice for die in dice)
+        hex_dice = tuple(tuple(die_ids[die] for die in tile.dice) for tile in board.hexes.values())
+        hands = tuple((tuple(die_ids[die] for die in player.hand), player.eat_score)
+                      for player in game_state.players.values())
+        game = (game_state.phase, game_state.current_round, tuple(game_state.peg_order), game_state.winner)
+        return tiles, pegs, dice, hex_dice, hands, game
+
+    def restore(self, keyframe: Keyframe):
+        """Bring the board to a keyframe, touching only what differs."""
+        replayer = self.replayer
+        game_state = self.game_state
+        board = game_state.board
+        tiles, pegs, dice, hex_dice, hands, game = keyframe.state
+
+        for tile, (color, number) in zip(list(board.hexes.values()), tiles):
+            if (tile.color, tile.number) != (color, number):
+                board.set_tile(tile.q, tile.r, color=color, number=number)
+
+        all_pegs = [peg for player_pegs in replayer.pegs for peg in player_pegs]
+        moved = [(peg, position) for peg, (position, _) in zip(all_pegs, pegs) if peg.position != position]
+        for peg, _ in moved:
+            if peg.position is not None:
+                board.remove_peg(peg)
+        for peg, position in moved:
+            if position is not None:
+                board.add_peg(peg, position)
+        for peg, (_, size) in zip(all_pegs, pegs):
+            if peg.size != size:
+                peg.size = size
+                board.notify(EVENT_PEG_CHANGED, peg)
+
+        all_dice = [die for player_dice in replayer.dice for die in player_dice]
+        for die, value in zip(all_dice, dice):
+            if die.value != value:
+                die.value = value
+                board.notify(EVENT_DIE_CHANGED, die)
+
+        # Re-stack only the hexes whose dice differ
+        for tile, ids in zip(list(board.hexes.values()), hex_dice):
+            wanted = [replayer.dice[owner][i] for owner, i in ids]
+            if tile.dice != wanted:
+                for die in list(tile.dice):
+                    board.remove_die_from_hex(die)
+                for die in wanted:
+                    board.assign_die_to_hex(die, tile)
+
+        for player, (hand, eat_score) in zip(game_state.players.values(), hands):
+            player.hand = [replayer.dice[owner][i] for owner, i in hand]
+            player.eat_score = eat_score
+        game_state.phase, game_state.current_round, peg_order, game_state.winner = game
+        game_state.peg_order = list(peg_order)
+        replayer.position = keyframe.position
+
+    def seek(self, position):
+        """Move to a record position, from the current state or the nearest keyframe."""
+        position = max(0, min(position, len(self.game_log)))
+        keyframe = self.keyframes[bisect.bisect_right(self.keyframe_positions, position) - 1]
+        # Replaying forward from here beats restoring if no keyframe lies in between
+        if not (keyframe.position <= self.replayer.position <= position):
+            self.restore(keyframe)
+        self.replayer.run(position - self.replayer.position)
+        return self.game_state
+
+    def seek_round(self, rnd):
+        """State at the end of round rnd (0 = after setup)."""
+        rnd = max(0, min(rnd, self.n_rounds))
+        return self.seek(self.round_starts[rnd])
+
+    def current_round(self):
+        """Last round fully applied at the current position."""
+        return max(bisect.bisect_right(self.round_starts, self.replayer.position) - 1, 0)
@@ -0,0 +1,94 @@
+from PyQt6.QtWidgets import (
+    QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+    QPushButton, QSlider, QSpinBox, QFileDialog
+)
+from PyQt6.QtCore import Qt
+import logging
+
+from peg_game_log import read_games
+from peg_replay import ReplayTimeline
+
+
+class ReplayDock(QDockWidget):
+    """Open a binary game log and scrub through a game round by round."""
+
+    def __init__(self, main_window: "MainWindow", parent=None):
+        super().__init__("Replay", parent)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.main_window = main_window
+        self.setAllowedAreas(Qt.DockWidgetArea.BottomDockWidgetArea | Qt.DockWidgetArea.LeftDockWidgetArea)
+        self.setFeatures(QDockWidget.DockWidgetFeature.DockWidgetClosable | QDockWidget.DockWidgetFeature.DockWidgetMovable)
+
+        self.games = []  # GameLog instances from the open file
+        self.timeline = None  # ReplayTimeline of the selected game
+
+        self.widget = QWidget()
+        layout = QVBoxLayout(self.widget)
+
+        top_row = QHBoxLayout()
+        open_btn = QPushButton("Open Game Log...")
+        open_btn.clicked.connect(lambda: self.open_log())
+        top_row.addWidget(open_btn)
+        top_row.addWidget(QLabel("Game:"))
+        self.game_spin = QSpinBox()
+        self.game_spin.setEnabled(False)
+        self.game_spin.valueChanged.connect(self.load_game)
+        top_row.addWidget(self.game_spin)
+        top_row.addStretch()
+        layout.addLayout(top_row)
+
+        timeline_row = QHBoxLayout()
+        self.prev_btn = QPushButton("◀")
+        self.prev_btn.clicked.connect(lambda: self.slider.setValue(self.slider.value() - 1))
+        timeline_row.addWidget(self.prev_btn)
+        self.slider = QSlider(Qt.Orientation.Horizontal)
+        self.slider.setEnabled(False)
+        self.slider.valueChanged.connect(self.seek_round)
+        timeline_row.addWidget(self.slider)
+        self.next_btn = QPushButton("▶")
+        self.next_btn.clicked.connect(lambda: self.slider.setValue(self.slider.value() + 1))
+        timeline_row.addWidget(self.next_btn)
+        self.round_label = QLabel("No replay loaded")
+        timeline_row.addWidget(self.round_label)
+        layout.addLayout(timeline_row)
+
+        self.setWidget(self.widget)
+
+    def open_log(self, path=None):
+        if path is None:
+            path, _ = QFileDialog.getOpenFileName(self, "Open Game Log", "", "PEG game logs (*.pegl);;All files (*)")
+            if not path:
+                return
+        self.games = list(read_games(path))
+        self.main_window.log(f'Opened {path}: {len(self.games)} games')
+        if not self.games:
+            return
+        self.game_spin.blockSignals(True)
+        self.game_spin.setRange(0, len(self.games) - 1)
+        self.game_spin.setValue(0)
+        self.game_spin.blockSignals(False)
+        self.game_spin.setEnabled(True)
+        self.load_game(0)
+
+    def load_game(self, index):
+        game_log = self.games[index]
+        self.timeline = ReplayTimeline(game_log)
+        self.main_window.set_game_state(self.timeline.game_state)
+        self.main_window.log(f'Replay game {index} (seed {game_log.seed}, {self.timeline.n_rounds} rounds)')
+
+        self.slider.blockSignals(True)
+        self.slider.setRange(0, self.timeline.n_rounds)
+        self.slider.setValue(self.timeline.n_rounds)
+        self.slider.blockSignals(False)
+        self.slider.setEnabled(True)
+        self.seek_round(self.timeline.n_rounds)
+
+    def seek_round(self, rnd):
+        if self.timeline is None:
+            return
+        # One batched scene refresh per seek, however many records it applies
+        self.main_window.board.run_phase(lambda game_state: self.timeline.seek_round(rnd))
+        self.main_window.player_dock.update_panel()
+        winner = self.timeline.game_state.winner
+        suffix = f" - winner {winner}" if winner and rnd == self.timeline.n_rounds else ""
+        self.round_label.setText(f"Round {rnd} / {self.timeline.n_rounds}{suffix}")
@@ -0,0 +1,140 @@
+"""
+GROW reroll advisor.
+
+Before spending, a player may reroll any subset of their hand once. For a hand,
+every distinct keep-set (sub-multiset) is scored exactly: the rerolled dice
+take every outcome multiset with its multinomial probability, and the kept +
+rerolled hand is valued by the GROW table's closed form: dice minus distinct
+non-6 faces (see peg_grow_table.partition_hand). So an outcome's value only
+depends on the kept non-6 faces and the number of dice rerolled, and those
+distributions (at most 32 x 7) are cached once.
+
+Hands of up to MAX_REROLL_DICE dice are solved over every keep-set and cached
+without limit (924 hands). For bigger hands only keep-sets rerolling at most
+MAX_REROLL_DICE dice are considered, and advice sits in a bounded cache.
+"""
+import functools
+import itertools
+import math
+from collections import Counter
+
+from peg_model import DICE_FACES
+from peg_grow_table import WILD_FACE
+
+
+class RerollAdvice:
+    def __init__(self, keep, reroll, expected_pegs, distribution):
+        """
+        Parameters:
+            keep (tuple): Faces to keep, sorted
+            reroll (tuple): Faces to reroll, sorted
+            expected_pegs (float): Expected pegs gained after the reroll
+            distribution (dict): {pegs gained: probability}
+        """
+        self.keep = keep
+        self.reroll = reroll
+        self.expected_pegs = expected_pegs
+        self.distribution = distribution
+
+    def __repr__(self):
+        return f'RerollAdvice(keep={self.keep}, reroll={self.reroll}, expected_pegs={self.expected_pegs:.3f})'
+
+
+MAX_REROLL_DICE = 6
+LARGE_HAND_CACHE_SIZE = 4096  # advice kept for hands bigger than MAX_REROLL_DICE
+
+# Sorted hand of up to MAX_REROLL_DICE dice: RerollAdvice
+REROLL_CACHE = {}
+
+
+@functools.lru_cache(maxsize=None)
+def reroll_outcomes(n_dice):
+    """Every outcome multiset of n_dice d6 with its probability."""
+    outcomes = []
+    total = len(DICE_FACES) ** n_dice
+    for outcome in itertools.combinations_with_replacement(DICE_FACES, n_dice):
+        ways = math.factorial(n_dice)
+        for count in Counter(outcome).values():
+            ways //= math.factorial(count)
+        outcomes.append((outcome, ways / total))
+    return outcomes
+
+
+@functools.lru_cache(maxsize=None)
+def faces_distribution(faces, n_reroll):
+    """{distinct non-6 faces after the reroll: probability}, given the kept non-6 faces (a frozenset)."""
+    distribution = {}
+    for outcome, probability in reroll_outcomes(n_reroll):
+        n_faces = len(faces.union(outcome) - {WILD_FACE})
+        distribution[n_faces] = distribution.get(n_faces, 0.0) + probability
+    return distribution
+
+
+def keep_distribution(keep, n_reroll):
+    """{pegs gained: probability} when keeping `keep` and rerolling n_reroll dice."""
+    n_dice = len(keep) + n_reroll
+    faces = frozenset(keep) - {WILD_FACE}
+    return {n_dice - n_faces: probability for n_faces, probability in faces_distribution(faces, n_reroll).items()}
+
+
+def keep_sets(hand):
+    """Distinct sub-multisets of a sorted hand."""
+    counts = sorted(Counter(hand).items())
+    for kept_counts in itertools.product(*(range(count + 1) for _, count in counts)):
+        yield tuple(face for (face, _), n in zip(counts, kept_counts) for _ in range(n))
+
+
+def solve_reroll(hand):
+    """Best RerollAdvice for a sorted hand; ties prefer rerolling fewer dice."""
+    best = None
+    for keep in keep_sets(hand):
+        n_reroll = len(hand) - len(keep)
+        if n_reroll > MAX_REROLL_DICE:
+            continue
+        distribution = keep_distribution(keep, n_reroll)
+        expected = sum(pegs * probability for pegs, probability in distribution.items())
+        key = (round(expected, 12), -n_reroll)
+        if best is None or key > best[0]:
+            best = key, keep, distribution, expected
+
+    _, keep, distribution, expected = best
+    reroll = list(hand)
+    for value in keep:
+        reroll.remove(value)
+    return RerollAdvice(keep, tuple(reroll), expected, dict(sorted(distribution.items())))
+
+
+def advise(values):
+    """RerollAdvice for a hand of die faces, in any order."""
+    hand = tuple(sorted(values))
+    if len(hand) > MAX_REROLL_DICE:
+        return advise_large(hand)
+    advice = REROLL_CACHE.get(hand)
+    if advice is None:
+        advice = REROLL_CACHE[hand] = solve_reroll(hand)
+    return advice
+
+
+@functools.lru_cache(maxsize=LARGE_HAND_CACHE_SIZE)
+def advise_large(hand):
+    """Advice for a sorted hand above MAX_REROLL_DICE (long games must not grow REROLL_CACHE)."""
+    return solve_reroll(hand)
+
+
+def build_reroll_table(max_dice=MAX_REROLL_DICE):
+    """Warm the cache for every hand of up to max_dice dice (for batch runs)."""
+    for n_dice in range(max_dice + 1):
+        for hand in itertools.combinations_with_replacement(DICE_FACES, n_dice):
+            advise(hand)
+    return REROLL_CACHE
+
+
+def dice_to_reroll(dice, advice: RerollAdvice):
+    """Pick Die objects from a hand matching the advice's reroll faces."""
+    wanted = Counter(advice.reroll)
+    picked = []
+    for die in dice:
+        if wanted[die.value]:
+            wanted[die.value] -= 1
+            picked.append(die)
+    return picked
@@ -0,0 +1,65 @@
+"""
+Per-game random number streams.
+
+Every game owns one GameRng (held by its BoardModel) and all randomness in
+board generation, dice and the rules draws from it, so a game is fully
+determined by its seed. Independent substreams are derived by hashing
+(root seed, spawn key), which lets process-pool workers play game i from
+substream i of one root seed without sharing or coordinating state.
+"""
+import hashlib
+import random
+
+
+SEED_BITS = 63  # derived seeds fit a signed 64-bit field (e.g. the game log header)
+
+
+def derive_seed(seed, spawn_key=()):
+    """Seed of the substream at spawn_key (a tuple of ints) under a root seed."""
+    if not spawn_key:
+        return seed
+    data = ','.join(map(str, (seed, *spawn_key))).encode()
+    digest = hashlib.blake2b(data, digest_size=8).digest()
+    return int.from_bytes(digest, 'little') >> (64 - SEED_BITS)
+
+
+def entropy_seed():
+    return random.SystemRandom().getrandbits(SEED_BITS)
+
+
+class GameRng(random.Random):
+    """random.Random that remembers its seed and can spawn independent children."""
+
+    def __init__(self, seed=None, spawn_key=()):
+        """
+        Parameters:
+            seed (int or None): Root seed; None draws one from the OS (and keeps it, so the game can be re-run)
+            spawn_key (tuple): Path of this stream below the root seed
+        """
+        self.root_seed = entropy_seed() if seed is None else seed
+        self.spawn_key = tuple(spawn_key)
+        self.n_spawned = 0
+        super().__init__(self.stream_seed)
+
+    @property
+    def stream_seed(self):
+        """Seed that recreates exactly this stream: GameRng(stream_seed)."""
+        return derive_seed(self.root_seed, self.spawn_key)
+
+    def substream(self, index):
+        """Child stream `index`; the same index always gives the same stream."""
+        return GameRng(self.root_seed, self.spawn_key + (index,))
+
+    def spawn(self, n_children=1):
+        """n_children new child streams, never handed out before by this GameRng."""
+        children = [self.substream(self.n_spawned + i) for i in range(n_children)]
+        self.n_spawned += n_children
+        return children
+
+    def __reduce__(self):
+        # Keep the seed bookkeeping when pickled to workers or deep-copied
+        return self.__class__, (self.root_seed, self.spawn_key), (self.getstate(), self.n_spawned)
+
+    def __setstate__(self, state):
+        random_state, self.n_spawned = state
+        self.setstate(random_state)
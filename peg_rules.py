@@ -1,58 +1,220 @@
 import logging
-import random
-from collections import defaultdict
-from peg_board import GameBoard
+from peg_game_state import GameState
+from peg_model import EVENT_PHASE_CHANGED, EVENT_PEG_ORDER_CHANGED, EVENT_HAND_SPENT, EVENT_GAME_OVER
+from peg_eat import EatResolver, most_dice_first
+from peg_grow_table import pegs_gained
+from peg_move_solver import MoveSolver
+from peg_reroll import advise, dice_to_reroll
 
 
 LOGGER = logging.getLogger(__name__)
 
+# What a player spends their hand on in GROW
+GROW_PLACE = 'place'  # new pegs from the GROW table
+GROW_MOVE = 'move'  # sum of the faces as movement range
 
-def play_phase_logic(board: GameBoard):
+
+def return_dice(game_state: GameState):
+    """Take every die off the board and out of player hands."""
+    game_state.board.clear_dice()
+    for player in game_state.players.values():
+        player.hand = []
+
+
+def roll_rain_dice(game_state: GameState):
+    board = game_state.board
+    for player in game_state.get_players_in_order():
+        for i, die in enumerate(player.rain_dice):
+            LOGGER.info(f'ROLL RAIN DIE {i} ({player.color})')
+            die.reroll()
+            board.assign_die_to_hex(die)
+
+
+def roll_food_dice(game_state: GameState):
+    """Each player rolls as many food dice as their rain dice show and places them."""
+    board = game_state.board
+    for player in game_state.get_players_in_order():
+        n_food = min(sum(die.value for die in player.rain_dice), len(player.food_dice))
+        LOGGER.info(f'ROLL {n_food} FOOD DICE ({player.color})')
+        for die in player.food_dice[:n_food]:
+            die.reroll()
+            board.assign_die_to_hex(die)
+
+
+def play_phase_logic(game_state: GameState):
     LOGGER.info("PLAY phase triggered.")
-    # for tile in board.hexes.values():
-    #     if tile.dice:
-    #         tile.dice.pop(0)
+    game_state.phase = GameState.PHASE_PLAY
+    game_state.current_round += 1
+    game_state.board.notify(EVENT_PHASE_CHANGED, game_state)
 
     # todo movement
-    board.roll_rain_dice()
+    return_dice(game_state)
+    roll_rain_dice(game_state)
+    roll_food_dice(game_state)
+
 
+def update_peg_order(game_state: GameState):
+    """Least dice in hand goes first; ties keep their relative order."""
+    game_state.peg_order.sort(key=lambda color: len(game_state.players[color].hand))
+    LOGGER.info(f'PEG ORDER: {game_state.peg_order}')
+    game_state.board.notify(EVENT_PEG_ORDER_CHANGED, game_state)
 
-def eat_phase_logic(board):
+
+def choose_hex(resolver: EatResolver, color, hex_ids):
+    """EAT hex choice: asks the player's bot if they have one, else most_dice_first."""
+    bot = resolver.game_state.players[color].bot
+    if bot is None:
+        return most_dice_first(resolver, color, hex_ids)
+    return bot.choose_hex(resolver, color, hex_ids)
+
+
+def eat_phase_logic(game_state: GameState):
     LOGGER.info("EAT phase triggered.")
-    board.eat_scores = defaultdict(int)
-    for color, dice_list in board.food_dice_pile.items():
-        for face in dice_list:
-            candidates = [tile for tile in board.hexes.values()
-                          if tile.color == color and tile.number == face]
-            if candidates:
-                chosen = random.choice(candidates)
-                chosen.dice.append(face)
-    for tile in board.hexes.values():
-        for peg in tile.pegs:
-            for die in tile.dice:
-                if tile.color in ['yellow', 'green'] and die == tile.number:
-                    board.eat_scores[peg.player] += peg.size
-    LOGGER.info("EAT scores:", dict(board.eat_scores))
-    board.draw_board()
-
-
-def grow_phase_logic(board):
+    game_state.phase = GameState.PHASE_EAT
+    game_state.board.notify(EVENT_PHASE_CHANGED, game_state)
+
+    # Players take turns in PEG order until nobody can pull any more dice
+    scores = EatResolver(game_state, choose_hex=choose_hex).run()
+
+    LOGGER.info(f"EAT scores: {scores}")
+    update_peg_order(game_state)
+
+
+def place_new_peg(game_state: GameState, player):
+    """Place one unplaced peg adjacent to the player's pegs. Returns the peg or None."""
+    board = game_state.board
+    unplaced = player.get_unplaced_pegs()
+    if not unplaced:
+        return None
+    slot_ids = board.legal_placement_ids(player.color)
+    if not slot_ids:
+        return None
+    if player.bot is not None:
+        slot_id = player.bot.choose_placement(game_state, player, slot_ids)
+    else:
+        slot_id = game_state.rng.choice(slot_ids)
+    return board.add_peg(unplaced[0], board.topology.slot_positions[slot_id])
+
+
+def move_pegs(game_state: GameState, player, move_range):
+    """
+    Share move_range across the player's placed pegs (best MoveSolver plan). Returns the plan.
+    A bot may supply the per-peg objective through move_score (None = hexes touched).
+    """
+    solver = MoveSolver(game_state.board, reachability=game_state.get_reachability())
+    score = player.bot.move_score(game_state, player) if player.bot is not None else None
+    plan = solver.solve(player.get_placed_pegs(), move_range, score)
+    solver.apply(plan)
+    LOGGER.info(f"{player.color} MOVE {len(plan.moves)} PEGS ({plan.range_used}/{move_range} RANGE)")
+    return plan
+
+
+def reroll_hand(player):
+    """Reroll the dice in hand that maximise expected pegs gained. Returns the advice."""
+    advice = advise([die.value for die in player.hand])
+    for die in dice_to_reroll(player.hand, advice):
+        die.reroll()
+    if advice.reroll:
+        LOGGER.info(f"{player.color} REROLL {advice.reroll} (EXPECTED PEGS {advice.expected_pegs:.2f})")
+    return advice
+
+
+def grow_phase_logic(game_state: GameState, reroll=True):
     LOGGER.info("GROW phase triggered.")
-    board.growth_die = random.randint(1, 6)
-    LOGGER.info("Growth Die:", board.growth_die)
-    for tile in board.hexes.values():
-        die_counts = defaultdict(int)
-        for die in tile.dice:
-            die_counts[die] += 1
-        for peg in tile.pegs:
-            grew = False
-            for die, count in die_counts.items():
-                if count > 1 or die == board.growth_die:
-                    if peg.size < 8:
-                        peg.size *= 2
-                    grew = True
-                    break
-            if grew:
-                LOGGER.info(f"{peg.player} peg grew to size {peg.size} at {tile.coords()}")
-
-    board.draw_board()
+    game_state.phase = GameState.PHASE_GROW
+    game_state.board.notify(EVENT_PHASE_CHANGED, game_state)
+    if reroll:
+        for player in game_state.get_players_in_order():
+            reroll_hand(player)
+    game_state.grow_queue = list(game_state.peg_order)
+    game_state.grow_turn = None
+    resume_grow(game_state)
+
+
+def spend_hand(game_state: GameState, player, option=None):
+    """
+    Start a player's GROW turn by spending their hand on new pegs or movement.
+    Without an option, the player's bot chooses (players without one always place).
+    """
+    values = [die.value for die in player.hand]
+    if option is None:
+        option = GROW_PLACE
+        if player.bot is not None and values and player.get_placed_pegs():
+            option = player.bot.choose_grow_option(game_state, player)
+    player.hand = []
+    game_state.board.notify(EVENT_HAND_SPENT, player)
+    if option == GROW_MOVE:
+        move_pegs(game_state, player, sum(values))
+    else:
+        player.pegs_to_place = pegs_gained(values)
+
+
+def place_pending_pegs(game_state: GameState, player):
+    while player.pegs_to_place:
+        player.pegs_to_place -= 1
+        peg = place_new_peg(game_state, player)
+        if peg is None and game_state.sized_pegs:
+            placed = player.get_placed_pegs()
+            if placed:
+                peg = min(placed, key=lambda p: p.size)
+                peg.grow()
+        if peg is None:
+            player.pegs_to_place = 0
+            break
+        LOGGER.info(f"{player.color} GROW {peg.get_name()}")
+
+
+def resume_grow(game_state: GameState):
+    """
+    Play the GROW turns in progress and still queued, stopping at a winner.
+    A copy taken mid-turn (e.g. by a search bot) finishes the phase from there.
+    """
+    while game_state.grow_turn is not None or game_state.grow_queue:
+        if game_state.grow_turn is None:
+            game_state.grow_turn = game_state.grow_queue.pop(0)
+            spend_hand(game_state, game_state.players[game_state.grow_turn])
+        player = game_state.players[game_state.grow_turn]
+        place_pending_pegs(game_state, player)
+        game_state.grow_turn = None
+
+        if not player.get_unplaced_pegs():
+            game_state.grow_queue = []
+            game_state.winner = player.color
+            LOGGER.info(f"WINNER: {player.color}")
+            game_state.board.notify(EVENT_GAME_OVER, game_state)
+            return
+
+
+def setup_game(game_state: GameState, n_start_pegs=1):
+    """
+    Place each player's starting pegs on random free vertices, away from other
+    pegs where possible. Pegs that find no free vertex stay unplaced.
+    """
+    board = game_state.board
+    topology = board.topology
+    game_state.current_round = 0
+    game_state.winner = None
+    vertices = [slot_id for slot_id in range(topology.n_slots) if topology.slot_is_vertex[slot_id]]
+    game_state.rng.shuffle(game_state.peg_order)
+    board.notify(EVENT_PEG_ORDER_CHANGED, game_state)
+    for player in game_state.get_players_in_order():
+        for peg in player.get_unplaced_pegs()[:n_start_pegs]:
+            free_vertices = [slot_id for slot_id in vertices if board.is_slot_free(topology.slot_positions[slot_id])]
+            open_vertices = [slot_id for slot_id in free_vertices
+                             if all(board.is_slot_free(topology.slot_positions[n]) for n in topology.neighbors[slot_id])]
+            if not free_vertices:
+                LOGGER.warning(f'NO FREE VERTEX FOR {player.color} START PEG')
+                break
+            slot_id = game_state.rng.choice(open_vertices or free_vertices)
+            board.add_peg(peg, topology.slot_positions[slot_id])
+
+
+def play_round(game_state: GameState, play_phase=None):
+    """
+    Run one full PLAY → EAT → GROW round. Returns the winner's color or None.
+    play_phase replaces play_phase_logic (e.g. peg_batch_dice.BatchPlayPhase).
+    """
+    (play_phase or play_phase_logic)(game_state)
+    eat_phase_logic(game_state)
+    grow_phase_logic(game_state)
+    return game_state.winner
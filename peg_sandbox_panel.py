@@ -4,7 +4,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtGui import QIcon, QPixmap, QColor
 from PyQt6.QtCore import Qt
-import peg_pieces
+import peg_model
 import logging
 
 
@@ -82,7 +82,7 @@ class SandboxDock(QDockWidget):
         """
 
         combo = QComboBox()
-        for color in peg_pieces.HEX_COLORS:
+        for color in peg_model.HEX_COLORS:
             pixmap = QPixmap(20, 20)
             pixmap.fill(QColor(color))
             icon = QIcon(pixmap)
@@ -0,0 +1,285 @@
+"""
+Batch Monte Carlo runner: plays complete headless PEG games across a process pool.
+
+Example:
+    python peg_simulate.py --games 10000 --players orange purple green --workers 8
+    python peg_simulate.py --games 100 --bots orange --bot-budget 0.1
+    python peg_simulate.py --games 100000 --greedy orange purple
+    python peg_simulate.py --games 100000 --batch-dice
+
+With --batch-dice every game takes its PLAY phase rolls from the NumPy batch
+dice engine (peg_batch_dice), drawn a block of rounds at a time.
+
+Seats listed in --bots are played by MctsBot (peg_mcts), searching inside the
+game's worker process; the summary reports their rollout throughput. Seats in
+--greedy are played by the vectorized GreedyBot (peg_greedy).
+
+Game i of a run plays on substream i of the run's --seed (see peg_rng), so
+results do not depend on worker scheduling, and any single game can be re-run
+exactly with play_game(game_seed(seed, i), ...) or from its logged seed.
+"""
+import argparse
+import logging
+import multiprocessing
+import sys
+import time
+from collections import Counter
+
+from peg_game_state import GameState
+from peg_model import BoardModel, BOARD_RADIUS
+from peg_game_log import GameRecorder, append_games
+from peg_rng import GameRng, derive_seed
+from peg_mcts import MctsBot, DEFAULT_BUDGET_S, DEFAULT_HORIZON
+from peg_greedy import GreedyBot
+from peg_batch_dice import BatchPlayPhase
+import peg_rules
+
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_COLORS = ['orange', 'purple']
+DEFAULT_N_PEGS = 12
+DEFAULT_MAX_ROUNDS = 200
+DEFAULT_CHUNK_SIZE = 50
+
+
+def play_game(seed, colors, n_pegs=DEFAULT_N_PEGS, radius=BOARD_RADIUS,
+              max_rounds=DEFAULT_MAX_ROUNDS, sized_pegs=False, record=False, bots=(), bot_options=None,
+              greedy=(), batch_dice=False):
+    """
+    Play one complete game and return a small result dict:
+        winner (str or None), rounds (int), pegs_placed ({color: int}),
+        bot_search ((decisions, rollouts, seconds) summed over the bots)
+        reach_cache ((hits, misses) of the game's movement reachability cache)
+    With record=True the dict also holds 'log': the encoded game (see peg_game_log).
+    Colors in bots are played by an in-process MctsBot built with bot_options,
+    colors in greedy by a GreedyBot. With batch_dice the PLAY phase rolls come
+    from a BatchPlayPhase seeded from the game seed.
+    """
+    game_state = GameState(board=BoardModel(radius=radius, rng=GameRng(seed)), sized_pegs=sized_pegs)
+    for seat, color in enumerate(colors):
+        bot = None
+        if color in bots:
+            bot = MctsBot(seed=derive_seed(seed, (seat,)), **(bot_options or {}))
+        elif color in greedy:
+            bot = GreedyBot()
+        game_state.add_player(color, n_pegs=n_pegs, bot=bot)
+    recorder = GameRecorder(game_state, seed=seed) if record else None
+    peg_rules.setup_game(game_state)
+    # Substream keys 0..n-1 seed the bots, so the batch engine takes key n
+    play_phase = BatchPlayPhase(game_state, seed=derive_seed(seed, (len(colors),))) if batch_dice else None
+
+    while game_state.current_round < max_rounds:
+        if peg_rules.play_round(game_state, play_phase=play_phase) is not None:
+            break
+
+    result = {
+        'winner': game_state.winner,
+        'rounds': game_state.current_round,
+        'pegs_placed': {color: len(player.get_placed_pegs()) for color, player in game_state.players.items()},
+        'bot_search': (0, 0, 0.0),
+        'reach_cache': (0, 0),
+    }
+    if game_state.reachability is not None:
+        result['reach_cache'] = (game_state.reachability.hits, game_state.reachability.misses)
+    for player in game_state.players.values():
+        if isinstance(player.bot, MctsBot):
+            decisions, rollouts, seconds = result['bot_search']
+            result['bot_search'] = (decisions + player.bot.n_decisions, rollouts + player.bot.n_rollouts,
+                                    seconds + player.bot.search_seconds)
+        if player.bot is not None:
+            player.bot.close()
+    if recorder is not None:
+        result['log'] = recorder.close()
+    return result
+
+
+def game_seed(seed, game_index):
+    """Seed of game game_index in a run started with seed."""
+    return derive_seed(seed, (game_index,))
+
+
+def play_chunk(task):
+    """
+    Worker entry point: play games [first_game, first_game + n_games) of the run seeded with seed.
+    Returns (SimulationStats, encoded game logs or b'' when not recording).
+    """
+    seed, first_game, n_games, config, record = task
+    stats = SimulationStats(config['colors'])
+    logs = []
+    for game_index in range(first_game, first_game + n_games):
+        result = play_game(game_seed(seed, game_index), record=record, **config)
+        if record:
+            logs.append(result.pop('log'))
+        stats.add(result)
+    return stats, b''.join(logs)
+
+
+class SimulationStats:
+    """Streamed aggregate of game results; partial stats from workers merge together."""
+
+    def __init__(self, colors):
+        self.colors = list(colors)
+        self.n_games = 0
+        self.n_unfinished = 0
+        self.wins = Counter()
+        self.round_total = 0
+        self.round_sq_total = 0
+        self.round_min = None
+        self.round_max = None
+        self.pegs_placed_total = Counter()
+        self.bot_decisions = 0
+        self.bot_rollouts = 0
+        self.bot_seconds = 0.0
+        self.reach_hits = 0
+        self.reach_misses = 0
+
+    def add(self, result):
+        self.n_games += 1
+        rounds = result['rounds']
+        if result['winner'] is None:
+            self.n_unfinished += 1
+        else:
+            self.wins[result['winner']] += 1
+        self.round_total += rounds
+        self.round_sq_total += rounds * rounds
+        self.round_min = rounds if self.round_min is None else min(self.round_min, rounds)
+        self.round_max = rounds if self.round_max is None else max(self.round_max, rounds)
+        self.pegs_placed_total.update(result['pegs_placed'])
+        decisions, rollouts, seconds = result.get('bot_search', (0, 0, 0.0))
+        self.bot_decisions += decisions
+        self.bot_rollouts += rollouts
+        self.bot_seconds += seconds
+        hits, misses = result.get('reach_cache', (0, 0))
+        self.reach_hits += hits
+        self.reach_misses += misses
+
+    def merge(self, other):
+        self.n_games += other.n_games
+        self.n_unfinished += other.n_unfinished
+        self.wins.update(other.wins)
+        self.round_total += other.round_total
+        self.round_sq_total += other.round_sq_total
+        for rounds in (other.round_min, other.round_max):
+            if rounds is not None:
+                self.round_min = rounds if self.round_min is None else min(self.round_min, rounds)
+                self.round_max = rounds if self.round_max is None else max(self.round_max, rounds)
+        self.pegs_placed_total.update(other.pegs_placed_total)
+        self.bot_decisions += other.bot_decisions
+        self.bot_rollouts += other.bot_rollouts
+        self.bot_seconds += other.bot_seconds
+        self.reach_hits += other.reach_hits
+        self.reach_misses += other.reach_misses
+
+    def mean_rounds(self):
+        return self.round_total / self.n_games if self.n_games else 0.0
+
+    def std_rounds(self):
+        if not self.n_games:
+            return 0.0
+        mean = self.mean_rounds()
+        return max(self.round_sq_total / self.n_games - mean * mean, 0.0) ** 0.5
+
+    def win_rate(self, color):
+        return self.wins[color] / self.n_games if self.n_games else 0.0
+
+    def summary(self):
+        lines = [
+            f'GAMES: {self.n_games} (unfinished: {self.n_unfinished})',
+            f'ROUNDS: mean {self.mean_rounds():.2f} std {self.std_rounds():.2f} '
+            f'min {self.round_min} max {self.round_max}',
+        ]
+        for color in self.colors:
+            mean_pegs = self.pegs_placed_total[color] / self.n_games if self.n_games else 0.0
+            lines.append(f'{color.upper():>12}: win rate {self.win_rate(color):6.1%}  '
+                         f'mean pegs placed {mean_pegs:.2f}')
+        if self.bot_decisions:
+            rate = self.bot_rollouts / self.bot_seconds if self.bot_seconds else 0.0
+            lines.append(f'BOTS: {self.bot_decisions} decisions, {self.bot_rollouts} rollouts '
+                         f'({self.bot_rollouts / self.bot_decisions:.1f}/decision, {rate:.0f} rollouts/s per worker)')
+        queries = self.reach_hits + self.reach_misses
+        if queries:
+            lines.append(f'REACH CACHE: {queries} queries, hit rate {self.reach_hits / queries:.1%}')
+        return '\n'.join(lines)
+
+
+def run_simulation(n_games, config, workers=None, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, progress=None,
+                   log_path=None):
+    """
+    Play n_games across a process pool and return the merged SimulationStats.
+
+    Every game gets its own substream of seed (see game_seed), so results do not
+    depend on how games are scheduled across workers. `progress(stats)` is called as each
+    chunk finishes. With log_path, every game is appended to that binary game log
+    (in completion order; each game's header holds its seed).
+    """
+    record = log_path is not None
+    tasks = []
+    for first in range(0, n_games, chunk_size):
+        tasks.append((seed, first, min(chunk_size, n_games - first), config, record))
+
+    stats = SimulationStats(config['colors'])
+    with multiprocessing.Pool(processes=workers) as pool:
+        for chunk_stats, logs in pool.imap_unordered(play_chunk, tasks):
+            stats.merge(chunk_stats)
+            if record:
+                append_games(log_path, logs)
+            if progress is not None:
+                progress(stats)
+    return stats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Play many headless PEG games and report outcomes.')
+    parser.add_argument('--games', type=int, default=1000, help='number of games to play')
+    parser.add_argument('--players', nargs='+', default=DEFAULT_COLORS, help='player colors, in seat order')
+    parser.add_argument('--pegs', type=int, default=DEFAULT_N_PEGS, help='pegs per player')
+    parser.add_argument('--radius', type=int, default=BOARD_RADIUS, help='board radius in hexes')
+    parser.add_argument('--max-rounds', type=int, default=DEFAULT_MAX_ROUNDS, help='rounds before a game is abandoned')
+    parser.add_argument('--sized-pegs', action='store_true', help='play the sized pegs variant')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=0, help='root seed; game i plays on substream i')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='games per worker task')
+    parser.add_argument('--log', default=None, help='append every game to this binary game log')
+    parser.add_argument('--bots', nargs='*', default=[], help='player colors played by the MCTS bot')
+    parser.add_argument('--bot-budget', type=float, default=DEFAULT_BUDGET_S, help='bot seconds per decision')
+    parser.add_argument('--bot-horizon', type=int, default=DEFAULT_HORIZON, help='bot rollout rounds after the current one')
+    parser.add_argument('--greedy', nargs='*', default=[], help='player colors played by the greedy bot')
+    parser.add_argument('--batch-dice', action='store_true', help='roll PLAY phase dice with the NumPy batch engine')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='[%(asctime)s] %(name)s - %(levelname)s: %(message)s',
+        handlers=[logging.StreamHandler(stream=sys.stdout)]
+    )
+    args = parse_args(argv)
+    config = {
+        'colors': args.players,
+        'n_pegs': args.pegs,
+        'radius': args.radius,
+        'max_rounds': args.max_rounds,
+        'sized_pegs': args.sized_pegs,
+        'bots': args.bots,
+        'bot_options': {'budget_s': args.bot_budget, 'horizon': args.bot_horizon},
+        'greedy': args.greedy,
+        'batch_dice': args.batch_dice,
+    }
+
+    start = time.perf_counter()
+
+    def progress(stats):
+        print(f'\r{stats.n_games}/{args.games} games', end='', flush=True)
+
+    stats = run_simulation(args.games, config, workers=args.workers, seed=args.seed,
+                           chunk_size=args.chunk_size, progress=progress, log_path=args.log)
+    elapsed = time.perf_counter() - start
+    print()
+    print(stats.summary())
+    print(f'ELAPSED: {elapsed:.2f}s ({stats.n_games / elapsed:.1f} games/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Board symmetries: the dihedral group of order 12 (six rotations, each with or
+without a reflection) acting on a hexagonal board.
+
+A symmetry moves tiles (with their colors and numbers), pegs and dice
+together, so the images of a layout or position are all equivalent. The
+canonical form is the smallest image under a fixed ordering. Layout dedupe,
+opening caches and search tables can key on it and store one entry for up to
+12 variants.
+
+Permutation tables of hex IDs and slot IDs are precomputed once per board
+radius. Like the topology tables they are stdlib arrays, so numpy can wrap
+them without copying.
+"""
+import functools
+from array import array
+
+from peg_topology import get_topology
+
+
+N_SYMMETRIES = 12  # index t: rotate t % 6 times by 60 degrees, after reflecting when t >= 6
+IDENTITY = 0
+
+
+def transform_coords(q, r, t):
+    """Axial coordinates of hex (q, r) under symmetry t (about hex (0, 0))."""
+    if t >= 6:
+        q, r = r, q  # reflection: swaps the cube x and z axes
+    for _ in range(t % 6):
+        q, r = -r, q + r
+    return q, r
+
+
+class SymmetryTables:
+    """
+    Tables (n = number of slots, h = number of hexes):
+        hex_perm[t]: array('i', h), hex ID -> hex ID of its image under t
+        slot_perm[t]: array('i', n), slot ID -> slot ID of its image under t
+        inverse[t]: index of the symmetry that undoes t
+    """
+
+    def __init__(self, topology):
+        self.topology = topology
+        self.hex_perm = []
+        self.slot_perm = []
+        for t in range(N_SYMMETRIES):
+            self.hex_perm.append(array('i', [topology.hex_ids[transform_coords(q, r, t)]
+                                             for q, r in topology.hex_coords]))
+            # Slot positions also name off-board hexes around the rim; they map like any hex
+            self.slot_perm.append(array('i', [
+                topology.slot_ids[tuple(sorted(transform_coords(q, r, t) for q, r in position))]
+                for position in topology.slot_positions
+            ]))
+
+        identity = list(range(topology.n_slots))
+        self.inverse = []
+        for t in range(N_SYMMETRIES):
+            perm = self.slot_perm[t]
+            self.inverse.append(next(u for u in range(N_SYMMETRIES)
+                                     if [self.slot_perm[u][perm[i]] for i in identity] == identity))
+        self.check()
+
+    def check(self):
+        """Assert every symmetry preserves slot adjacency and which hexes each slot touches."""
+        topology = self.topology
+        for t in range(N_SYMMETRIES):
+            hex_perm, slot_perm = self.hex_perm[t], self.slot_perm[t]
+            for slot_id in range(topology.n_slots):
+                image = slot_perm[slot_id]
+                assert ({slot_perm[n] for n in topology.neighbors[slot_id]} == set(topology.neighbors[image])), \
+                    f'SYMMETRY {t} BREAKS ADJACENCY AT SLOT {slot_id}'
+                assert ({hex_perm[h] for h in topology.hexes_for_slot(slot_id)} == set(topology.hexes_for_slot(image))), \
+                    f'SYMMETRY {t} BREAKS SLOT-HEX INCIDENCE AT SLOT {slot_id}'
+
+    def __reduce__(self):
+        return get_symmetry_tables, (self.topology.radius,)
+
+
+@functools.lru_cache(maxsize=None)
+def get_symmetry_tables(radius):
+    return SymmetryTables(get_topology(radius))
+
+
+def layout_image(board, t):
+    """Tiles as ((color, number) per hex ID) after moving them by symmetry t."""
+    tables = get_symmetry_tables(board.radius)
+    hex_perm = tables.hex_perm[t]
+    tiles = [None] * board.topology.n_hexes
+    for hex_id, (q, r) in enumerate(board.topology.hex_coords):
+        tile = board.hexes[(q, r)]
+        tiles[hex_perm[hex_id]] = (tile.color, tile.number)
+    return tuple(tiles)
+
+
+def canonical_layout(board):
+    """
+    Canonical form of the board's tile layout. Returns (layout, t), where t is
+    the symmetry taking this board to the canonical one (lowest t on ties,
+    i.e. when the layout is itself symmetric).
+    """
+    return min((layout_image(board, t), t) for t in range(N_SYMMETRIES))
+
+
+def position_image(game_state, t):
+    """Layout, pegs and dice of a game after symmetry t; hands, PEG order and phase do not move."""
+    board = game_state.board
+    topology = board.topology
+    tables = get_symmetry_tables(board.radius)
+    hex_perm = tables.hex_perm[t]
+    slot_perm = tables.slot_perm[t]
+    pegs = tuple(sorted((slot_perm[topology.slot_ids[position]], peg.color, peg.size)
+                        for position, peg in board.pegs.items()))
+    dice = tuple(sorted((hex_perm[topology.hex_ids[die.position]], die.color, die.value)
+                        for player in game_state.players.values() for die in player.get_dice()
+                        if die.position is not None))
+    hands = tuple((color, tuple(sorted((die.color, die.value) for die in player.hand)))
+                  for color, player in sorted(game_state.players.items()))
+    return layout_image(board, t), pegs, dice, hands, tuple(game_state.peg_order), game_state.phase
+
+
+def canonical_position(game_state):
+    """Canonical form of the full game position. Returns (position, t) like canonical_layout."""
+    return min((position_image(game_state, t), t) for t in range(N_SYMMETRIES))
+
+
+def map_slot(radius, slot_id, t):
+    """Slot ID under symmetry t, e.g. to store a move in the canonical frame."""
+    return get_symmetry_tables(radius).slot_perm[t][slot_id]
+
+
+def unmap_slot(radius, slot_id, t):
+    """Slot ID back from the frame symmetry t maps to, e.g. a cached move applied to this board."""
+    tables = get_symmetry_tables(radius)
+    return tables.slot_perm[tables.inverse[t]][slot_id]
+
+
+def map_hex(radius, hex_id, t):
+    return get_symmetry_tables(radius).hex_perm[t][hex_id]
+
+
+def unmap_hex(radius, hex_id, t):
+    tables = get_symmetry_tables(radius)
+    return tables.hex_perm[tables.inverse[t]][hex_id]
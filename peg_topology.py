@@ -0,0 +1,103 @@
+"""
+Precomputed peg-slot topology for a hexagonal board of a given radius.
+
+Every peg hole (vertex or edge) gets one compact integer slot ID, no matter
+which of the 2-3 (q, r, peg_index) triples reaches it. Tables are stdlib
+arrays so they can be wrapped with numpy.asarray() without copying.
+"""
+import functools
+from array import array
+
+import hex_logic
+
+
+NO_HEX = -1  # padding in slot_hexes for edges and off-board hexes
+
+
+def board_hex_coords(radius):
+    """Axial coordinates of every hex on a hexagonal board, in build_hex_grid order."""
+    coords = []
+    for q in range(-radius, radius + 1):
+        r1 = max(-radius, -q - radius)
+        r2 = min(radius, -q + radius)
+        for r in range(r1, r2 + 1):
+            coords.append((q, r))
+    return coords
+
+
+class SlotTopology:
+    """
+    Tables (n = number of slots, h = number of hexes):
+        hex_coords[hex_id] -> (q, r);  hex_ids[(q, r)] -> hex_id
+        slot_positions[slot_id] -> canonical position tuple;  slot_ids[position] -> slot_id
+        slot_is_vertex: array('b', n)
+        slot_hexes: array('i', n * 3), on-board hex IDs touched by each slot, NO_HEX padded
+        neighbor_offsets / neighbor_slots: CSR slot -> adjacent slot IDs
+        hex_slot_table: array('i', h * 12), slot ID of (hex_id, peg_index) for this orientation
+        hex_slot_ids[hex_id] -> tuple of the 12 slot IDs around the hex
+    """
+
+    def __init__(self, radius, pointy_top=True):
+        self.radius = radius
+        self.pointy_top = pointy_top
+
+        self.hex_coords = board_hex_coords(radius)
+        self.hex_ids = {qr: i for i, qr in enumerate(self.hex_coords)}
+
+        positions = set()
+        for q, r in self.hex_coords:
+            positions.update(hex_logic.hex_slots(q, r))
+        self.slot_positions = sorted(positions)
+        self.slot_ids = {position: i for i, position in enumerate(self.slot_positions)}
+        self.n_slots = len(self.slot_positions)
+        self.n_hexes = len(self.hex_coords)
+
+        self.slot_is_vertex = array('b', [len(position) == 3 for position in self.slot_positions])
+        self.slot_hexes = array('i')
+        for position in self.slot_positions:
+            hex_ids = [self.hex_ids[qr] for qr in position if qr in self.hex_ids]
+            self.slot_hexes.extend(hex_ids + [NO_HEX] * (3 - len(hex_ids)))
+
+        # Slot adjacency (only slots that exist on this board)
+        self.neighbors = []
+        self.neighbor_offsets = array('i', [0])
+        self.neighbor_slots = array('i')
+        for position in self.slot_positions:
+            ids = tuple(self.slot_ids[n] for n in hex_logic.slot_neighbors(position) if n in self.slot_ids)
+            self.neighbors.append(ids)
+            self.neighbor_slots.extend(ids)
+            self.neighbor_offsets.append(len(self.neighbor_slots))
+
+        # (hex, peg_index) -> slot, following peg_to_pixel's index order
+        self.hex_slot_table = array('i')
+        for q, r in self.hex_coords:
+            for peg_index in range(12):
+                position = hex_logic.get_hexes_for_peg(q, r, peg_index, self.pointy_top)
+                self.hex_slot_table.append(self.slot_ids[position])
+        self.hex_slot_ids = [tuple(self.hex_slot_table[h * 12:(h + 1) * 12]) for h in range(self.n_hexes)]
+
+    def __reduce__(self):
+        # Pickled and deep-copied by reference to the shared cached instance
+        # (arguments spelled as callers spell them, so the lru_cache key matches)
+        return get_topology, (self.radius,) if self.pointy_top else (self.radius, False)
+
+    def slot_id(self, q, r, peg_index):
+        """Slot ID of peg_index around hex (q, r); KeyError if (q, r) is off the board."""
+        return self.hex_slot_table[self.hex_ids[(q, r)] * 12 + peg_index % 12]
+
+    def hexes_for_slot(self, slot_id):
+        """On-board hex IDs touched by a slot."""
+        return [h for h in self.slot_hexes[slot_id * 3:slot_id * 3 + 3] if h != NO_HEX]
+
+    def are_adjacent(self, slot_a, slot_b):
+        return slot_b in self.neighbors[slot_a]
+
+    def slots_reaching_hex(self, hex_id):
+        """Slots from which a peg can EAT from this hex."""
+        return self.hex_slot_ids[hex_id]
+
+
+@functools.lru_cache(maxsize=None)
+def get_topology(radius, pointy_top=True):
+    """Shared, cached topology per (radius, orientation). Treat it as read-only."""
+    return SlotTopology(radius, pointy_top)
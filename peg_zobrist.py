@@ -0,0 +1,230 @@
+"""
+Zobrist hashing of PEG positions and a bounded transposition table.
+
+A position hashes to the XOR of one 63-bit key per feature:
+    pegs:           (color, size, slot ID)
+    dice on hexes:  (hex ID, die color, face, copy)
+    dice in hands:  (holder color, die color, face, copy)
+    PEG order:      (rank, color)
+    phase
+Dice of the same color and face are interchangeable, so the k-th copy of one
+at a location gets its own key (a repeated key would XOR out). Positions
+reached by different pull or placement orders therefore hash alike.
+
+Keys are derived from the feature itself (see peg_rng.derive_seed), so every
+process hashes a position the same way. ZobristHasher listens to the board
+like a view does and updates the hash on each event in O(1).
+"""
+import logging
+from collections import Counter
+
+from peg_game_state import GameState
+from peg_model import (
+    EVENT_BOARD_RESET, EVENT_PEG_ADDED, EVENT_PEG_REMOVED, EVENT_PEG_CHANGED, EVENT_DIE_MOVED,
+    EVENT_DIE_CHANGED, EVENT_DICE_PULLED, EVENT_HAND_SPENT, EVENT_PHASE_CHANGED, EVENT_PEG_ORDER_CHANGED,
+)
+from peg_rng import derive_seed
+
+
+ZOBRIST_SEED = 0x5EED_2097  # root of every feature key
+DEFAULT_TT_CAPACITY = 1 << 16  # entries
+DEFAULT_BUCKET_SIZE = 4
+
+FEATURE_PEG = 0
+FEATURE_HEX_DIE = 1
+FEATURE_HAND_DIE = 2
+FEATURE_ORDER = 3
+FEATURE_PHASE = 4
+FEATURE_OTHER = 5  # free for callers, e.g. to tell decisions apart in one table
+
+KEYS = {}  # feature tuple: key, filled on first use
+
+
+def zobrist_key(*feature):
+    key = KEYS.get(feature)
+    if key is None:
+        key = KEYS[feature] = derive_seed(ZOBRIST_SEED, feature)
+    return key
+
+
+class ZobristHasher:
+    def __init__(self, game_state: GameState):
+        """
+        Parameters:
+            game_state (GameState): Game to follow; the hasher listens to its board until detach()
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.game_state = game_state
+        self.board = game_state.board
+        self.hash = 0
+        self.peg_keys = {}  # Peg: key (positions are cleared before PEG_REMOVED fires)
+        self.die_features = {}  # Die: (kind, location, color, face) while on a hex or in a hand
+        self.die_counts = Counter()  # (kind, location, color, face): copies hashed
+        self.order_hash = 0
+        self.phase_key = 0
+
+        self.reset()
+        self.board.add_listener(self.on_board_event)
+
+    def detach(self):
+        self.board.remove_listener(self.on_board_event)
+
+    def reset(self):
+        """Rebuild the hash from scratch. Returns it."""
+        board = self.board
+        self.hash = 0
+        self.peg_keys.clear()
+        self.die_features.clear()
+        self.die_counts.clear()
+        self.order_hash = 0
+        self.phase_key = 0
+
+        for peg in board.pegs.values():
+            self.set_peg(peg)
+        for player in self.game_state.players.values():
+            for die in player.get_dice():
+                if die.position is not None:
+                    self.set_die(die, FEATURE_HEX_DIE, board.topology.hex_ids[die.position])
+            for die in player.hand:
+                self.set_die(die, FEATURE_HAND_DIE, player.color)
+        self.set_order()
+        self.set_phase()
+        return self.hash
+
+    def set_peg(self, peg, placed=True):
+        self.hash ^= self.peg_keys.pop(peg, 0)
+        if placed and peg.position is not None:
+            key = zobrist_key(FEATURE_PEG, peg.color, peg.size, self.board.topology.slot_ids[peg.position])
+            self.peg_keys[peg] = key
+            self.hash ^= key
+
+    def set_die(self, die, kind=None, location=None):
+        """Move a die's feature to (kind, location) with its current face; kind None = off the hash."""
+        feature = self.die_features.pop(die, None)
+        if feature is not None:
+            self.die_counts[feature] -= 1
+            self.hash ^= zobrist_key(*feature, self.die_counts[feature])
+        if kind is not None:
+            feature = self.die_features[die] = (kind, location, die.color, die.value)
+            self.hash ^= zobrist_key(*feature, self.die_counts[feature])
+            self.die_counts[feature] += 1
+
+    def set_order(self):
+        self.hash ^= self.order_hash
+        self.order_hash = 0
+        for rank, color in enumerate(self.game_state.peg_order):
+            self.order_hash ^= zobrist_key(FEATURE_ORDER, rank, color)
+        self.hash ^= self.order_hash
+
+    def set_phase(self):
+        self.hash ^= self.phase_key
+        self.phase_key = zobrist_key(FEATURE_PHASE, self.game_state.phase)
+        self.hash ^= self.phase_key
+
+    def clear_hands(self, color=None):
+        for die, (kind, location, _, _) in list(self.die_features.items()):
+            if kind == FEATURE_HAND_DIE and (color is None or location == color):
+                self.set_die(die)
+
+    def on_board_event(self, event, obj):
+        if event in (EVENT_PEG_ADDED, EVENT_PEG_CHANGED):
+            self.set_peg(obj)
+        elif event == EVENT_PEG_REMOVED:
+            self.set_peg(obj, placed=False)
+        elif event == EVENT_DIE_MOVED:
+            if obj.position is None:
+                self.set_die(obj)
+            else:
+                self.set_die(obj, FEATURE_HEX_DIE, self.board.topology.hex_ids[obj.position])
+        elif event == EVENT_DIE_CHANGED:
+            feature = self.die_features.get(obj)
+            if feature is not None:
+                self.set_die(obj, feature[0], feature[1])
+        elif event == EVENT_DICE_PULLED:
+            color, dice = obj
+            for die in dice:
+                self.set_die(die, FEATURE_HAND_DIE, color)
+        elif event == EVENT_HAND_SPENT:
+            self.clear_hands(obj.color)
+        elif event == EVENT_PHASE_CHANGED:
+            self.set_phase()
+            if self.game_state.phase == GameState.PHASE_PLAY:
+                # PLAY returns every die, hands included (see peg_rules.return_dice)
+                self.clear_hands()
+        elif event == EVENT_PEG_ORDER_CHANGED:
+            self.set_order()
+        elif event == EVENT_BOARD_RESET:
+            self.reset()
+
+
+class TTEntry:
+    __slots__ = ('key', 'value', 'depth', 'generation')
+
+    def __init__(self, key, value, depth, generation):
+        self.key = key
+        self.value = value
+        self.depth = depth
+        self.generation = generation
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results keyed by Zobrist hash.
+
+    Entries live in buckets of bucket_size, picked by the low bits of the key.
+    When a bucket is full, the victim is an entry from an older search
+    generation first, then the one with the least depth (search effort).
+    """
+
+    def __init__(self, capacity=DEFAULT_TT_CAPACITY, bucket_size=DEFAULT_BUCKET_SIZE):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        n_buckets = 1
+        while n_buckets * bucket_size < capacity:
+            n_buckets *= 2
+        self.mask = n_buckets - 1
+        self.bucket_size = bucket_size
+        self.buckets = [[] for _ in range(n_buckets)]
+        self.generation = 0
+        self.n_entries = 0
+        self.hits = 0
+        self.misses = 0
+        self.replacements = 0
+
+    @property
+    def capacity(self):
+        return len(self.buckets) * self.bucket_size
+
+    def __len__(self):
+        return self.n_entries
+
+    def new_generation(self, generation=None):
+        """Start a new search (e.g. a new round); older entries are replaced first from now on."""
+        self.generation = self.generation + 1 if generation is None else generation
+
+    def get(self, key):
+        for entry in self.buckets[key & self.mask]:
+            if entry.key == key:
+                self.hits += 1
+                entry.generation = self.generation
+                return entry.value
+        self.misses += 1
+        return None
+
+    def put(self, key, value, depth=0):
+        bucket = self.buckets[key & self.mask]
+        for entry in bucket:
+            if entry.key == key:
+                entry.value, entry.depth, entry.generation = value, depth, self.generation
+                return
+        if len(bucket) < self.bucket_size:
+            bucket.append(TTEntry(key, value, depth, self.generation))
+            self.n_entries += 1
+            return
+        victim = min(bucket, key=lambda entry: (entry.generation == self.generation, entry.depth))
+        victim.key, victim.value, victim.depth, victim.generation = key, value, depth, self.generation
+        self.replacements += 1
+
+    def clear(self):
+        for bucket in self.buckets:
+            bucket.clear()
+        self.n_entries = 0
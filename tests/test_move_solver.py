@@ -0,0 +1,49 @@
+import random
+import time
+
+from peg_game_state import GameState
+from peg_model import BoardModel
+from peg_rng import GameRng
+from peg_move_solver import MoveSolver, DEFAULT_BUDGET_MS
+from peg_greedy import GreedyBot
+
+N_PEGS = 12
+SOLVE_LIMIT_MS = 10 * DEFAULT_BUDGET_MS  # budget plus option building, with headroom for slow machines
+
+
+def full_position(seed):
+    """Two players with all 12 pegs each scattered over a default board."""
+    game_state = GameState(board=BoardModel(rng=GameRng(seed)))
+    mover = game_state.add_player('orange', n_pegs=N_PEGS)
+    other = game_state.add_player('purple', n_pegs=N_PEGS)
+    topology = game_state.board.topology
+    slot_ids = list(range(topology.n_slots))
+    random.Random(seed).shuffle(slot_ids)
+    for peg in mover.pegs + other.pegs:
+        game_state.board.add_peg(peg, topology.slot_positions[slot_ids.pop()])
+    return game_state, mover
+
+
+def test_solve_time_is_bounded_on_a_full_position():
+    for seed in range(5):
+        game_state, mover = full_position(seed)
+        score = GreedyBot().move_score(game_state, mover)
+        solver = MoveSolver(game_state.board)
+
+        start = time.perf_counter()
+        plan = solver.solve(mover.get_placed_pegs(), 36, score)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        assert elapsed_ms < SOLVE_LIMIT_MS
+        assert plan.range_used <= 36
+        assert len({to_slot for _, _, to_slot, _ in plan.moves}) == len(plan.moves)
+
+
+def test_budgeted_plan_is_at_least_the_greedy_plan():
+    game_state, mover = full_position(7)
+    score = GreedyBot().move_score(game_state, mover)
+    pegs = mover.get_placed_pegs()
+    solver = MoveSolver(game_state.board, max_nodes=1)
+    options = [solver.peg_options(peg, 24, score, keep=len(pegs)) for peg in pegs]
+    _, greedy_total = MoveSolver.greedy_choice(options, 24)
+    assert solver.solve(pegs, 24, score).score >= greedy_total